@@ -6,9 +6,9 @@ Enhanced CLI with rich formatting
 
 import argparse
 import sys
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from main import CodebaseArchaeologist
-from src.utils.logger import logger, setup_logger
 
 def print_banner():
     """Print ASCII banner"""
@@ -24,42 +24,105 @@ def print_banner():
     """
     print(banner)
 
+def _truncate_name(name: str, width: int) -> str:
+    """Truncate a name to fit a fixed-width column"""
+    return name if len(name) <= width else name[:width - 1] + "…"
+
 def print_summary_table(summary: dict):
     """Print formatted summary table"""
-    print("\n" + "="*70)
-    print(" "*25 + "ANALYSIS SUMMARY")
-    print("="*70)
+    lines = [
+        "",
+        "="*70,
+        " "*25 + "ANALYSIS SUMMARY",
+        "="*70,
+    ]
     
-    print(f"\n📊 Code Statistics:")
-    print(f"   ├─ Total Functions:    {summary.get('total_functions', 0):>8}")
-    print(f"   ├─ Total Classes:      {summary.get('total_classes', 0):>8}")
-    print(f"   └─ Lines of Code:      {summary.get('total_lines_of_code', 0):>8,}")
+    lines.append(f"\n📊 Code Statistics:")
+    lines.append(f"   ├─ Total Functions:    {summary.get('total_functions', 0):>8}")
+    lines.append(f"   ├─ Total Classes:      {summary.get('total_classes', 0):>8}")
+    lines.append(f"   └─ Lines of Code:      {summary.get('total_lines_of_code', 0):>8,}")
     
-    print(f"\n📈 Quality Metrics:")
+    lines.append(f"\n📈 Quality Metrics:")
     complexity = summary.get('average_complexity', 0)
     complexity_status = "✅ Good" if complexity <= 5 else "⚠️  Moderate" if complexity <= 10 else "❌ High"
-    print(f"   ├─ Avg Complexity:     {complexity:>8.2f}  {complexity_status}")
+    lines.append(f"   ├─ Avg Complexity:     {complexity:>8.2f}  {complexity_status}")
     
     mi = summary.get('average_maintainability', 0)
     mi_rank = "A" if mi >= 20 else "B" if mi >= 10 else "C"
     mi_status = "✅ Good" if mi >= 20 else "⚠️  Moderate" if mi >= 10 else "❌ Poor"
-    print(f"   ├─ Maintainability:    {mi:>8.2f}  ({mi_rank}) {mi_status}")
+    lines.append(f"   ├─ Maintainability:    {mi:>8.2f}  ({mi_rank}) {mi_status}")
     
     smells = summary.get('total_code_smells', 0)
     smell_status = "✅ Few" if smells < 10 else "⚠️  Many" if smells < 30 else "❌ Critical"
-    print(f"   └─ Code Smells:        {smells:>8}  {smell_status}")
+    lines.append(f"   └─ Code Smells:        {smells:>8}  {smell_status}")
     
     # Most complex files
     complex_files = summary.get('most_complex_files', [])
     if complex_files:
-        print(f"\n⚠️  Most Complex Files:")
-        for i, file_info in enumerate(complex_files[:5], 1):
-            filename = Path(file_info['file']).name
+        lines.append(f"\n⚠️  Most Complex Files:")
+        rows = []
+        for file_info in complex_files[:5]:
             complexity = file_info['complexity']
             status = "🟢" if complexity <= 5 else "🟡" if complexity <= 10 else "🔴"
-            print(f"   {i}. {status} {filename:<40} M={complexity:.1f}")
+            rows.append((status, _truncate_name(Path(file_info['file']).name, 40), complexity))
+        for i, (status, filename, complexity) in enumerate(rows, 1):
+            lines.append(f"   {i}. {status} {filename:<40} M={complexity:.1f}")
+    
+    lines.append("\n" + "="*70 + "\n")
     
-    print("\n" + "="*70 + "\n")
+    # Emit the whole table with a single write
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def generate_markdown(results: dict, output_dir: Path) -> list:
+    """Generate the Markdown report, returning (label, path) pairs"""
+    from src.reporting.markdown_generator import MarkdownGenerator
+    generator = MarkdownGenerator(str(output_dir / "reports"))
+    return [("📄 Markdown report", generator.generate_report(results))]
+
+def generate_html(results: dict, output_dir: Path) -> list:
+    """Generate the HTML report, returning (label, path) pairs"""
+    from src.reporting.html_generator import HTMLGenerator
+    html_gen = HTMLGenerator(str(output_dir / "reports"))
+    return [("🌐 HTML report", html_gen.generate_report(results))]
+
+def generate_graphs(results: dict, output_dir: Path) -> list:
+    """
+    Generate all graphs, returning (label, path) pairs
+    
+    Graphs are drawn one after another inside a single task because
+    pyplot's global figure state is not thread-safe.
+    """
+    from src.visualization.graph_generator import GraphGenerator
+    viz_gen = GraphGenerator(str(output_dir / "graphs"))
+    outputs = []
+    
+    # Generate dependency graph
+    if 'dependencies' in results and results['dependencies'].get('dependency_graph'):
+        outputs.append(("📊 Dependency graph", viz_gen.generate_dependency_graph(
+            results['dependencies']['dependency_graph']
+        )))
+    
+    # Generate complexity chart
+    outputs.append(("📊 Complexity chart", viz_gen.generate_complexity_chart(results['files'])))
+    
+    # Generate metrics summary
+    outputs.append(("📊 Metrics summary", viz_gen.generate_metrics_summary(results['summary'])))
+    
+    return outputs
+
+def source_path(value: str) -> tuple:
+    """
+    argparse type for the analysis target
+    
+    Returns:
+        ('github', url) for http(s) URLs, otherwise ('local', resolved Path)
+    """
+    if urlparse(value).scheme in ('http', 'https'):
+        return ('github', value)
+    try:
+        return ('local', Path(value).resolve(strict=True))
+    except (FileNotFoundError, RuntimeError):
+        raise argparse.ArgumentTypeError(f"path does not exist: {value}")
 
 def create_parser():
     """Create argument parser"""
@@ -93,10 +156,25 @@ For more information, visit: https://github.com/yourusername/codebase-archaeolog
     # Positional arguments
     parser.add_argument(
         'path',
+        type=source_path,
         help='Path to local codebase or GitHub repository URL'
     )
     
-    # Optional arguments
+    # Logging options
+    logging_group = parser.add_mutually_exclusive_group()
+    logging_group.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='Minimal output (errors only)'
+    )
+    
+    logging_group.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Verbose output (debug level)'
+    )
+    
+    # Configuration options
     parser.add_argument(
         '-c', '--config',
         default='config.yaml',
@@ -105,6 +183,7 @@ For more information, visit: https://github.com/yourusername/codebase-archaeolog
     
     parser.add_argument(
         '-o', '--output',
+        type=Path,
         help='Output directory for reports (overrides config)'
     )
     
@@ -133,20 +212,6 @@ For more information, visit: https://github.com/yourusername/codebase-archaeolog
         help='Open HTML report in browser after generation'
     )
     
-    # Logging options
-    logging_group = parser.add_mutually_exclusive_group()
-    logging_group.add_argument(
-        '-q', '--quiet',
-        action='store_true',
-        help='Minimal output (errors only)'
-    )
-    
-    logging_group.add_argument(
-        '-v', '--verbose',
-        action='store_true',
-        help='Verbose output (debug level)'
-    )
-    
     # Info options
     parser.add_argument(
         '--version',
@@ -161,6 +226,13 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    # Heavy imports are deferred until after argument parsing so that
+    # --help, --version and usage errors return without loading the
+    # analysis stack
+    from main import CodebaseArchaeologist
+    from src.utils.logger import logger, setup_logger
+    from src.utils.helpers import ensure_dir
+    
     # Show banner (unless quiet mode)
     if not args.quiet:
         print_banner()
@@ -179,22 +251,24 @@ def main():
         # Initialize archaeologist
         logger.info("Initializing Codebase Archaeologist...")
         archaeologist = CodebaseArchaeologist(args.config)
-        
+
+        # The archaeologist configures logging from the config file;
+        # an explicit -q/-v on the command line takes precedence
+        if args.quiet or args.verbose:
+            setup_logger(level=log_level, log_file='archaeologist.log')
+
         # Override output directory if specified
         if args.output:
-            archaeologist.output_dir = Path(args.output)
-            archaeologist.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Determine source type
-        is_github = args.path.startswith('http')
+            archaeologist.output_dir = ensure_dir(args.output)
         
         # Run analysis
-        if is_github:
-            logger.info(f"Analyzing GitHub repository: {args.path}")
-            results = archaeologist.analyze_github(args.path)
+        source_type, source = args.path
+        if source_type == 'github':
+            logger.info(f"Analyzing GitHub repository: {source}")
+            results = archaeologist.analyze_github(source)
         else:
-            logger.info(f"Analyzing local codebase: {args.path}")
-            results = archaeologist.analyze_local(args.path)
+            logger.info(f"Analyzing local codebase: {source}")
+            results = archaeologist.analyze_local(str(source))
         
         if not results:
             logger.error("Analysis failed. Please check the path and try again.")
@@ -204,66 +278,54 @@ def main():
         if not args.quiet:
             print_summary_table(results['summary'])
         
-        # Generate additional outputs
-        html_report_path = None
-        
-        # Generate Markdown report
+        # Generate additional outputs concurrently; each task writes its own files
+        jobs = []
         if not args.no_report and args.format in ['markdown', 'all']:
-            from src.reporting.markdown_generator import MarkdownGenerator
-            generator = MarkdownGenerator(str(archaeologist.output_dir / "reports"))
-            report_path = generator.generate_report(results)
-            if report_path:
-                logger.info(f"📄 Markdown report: {report_path}")
-        
-        # Generate HTML report
+            jobs.append(generate_markdown)
         if not args.no_report and args.format in ['html', 'all']:
-            from src.reporting.html_generator import HTMLGenerator
-            html_gen = HTMLGenerator(str(archaeologist.output_dir / "reports"))
-            html_report_path = html_gen.generate_report(results)
-            if html_report_path:
-                logger.info(f"🌐 HTML report: {html_report_path}")
-        
+            jobs.append(generate_html)
         if not args.no_visualize:
-            from src.visualization.graph_generator import GraphGenerator
-            viz_gen = GraphGenerator(str(archaeologist.output_dir / "graphs"))
-            
-            # Generate dependency graph
-            if 'dependencies' in results and results['dependencies'].get('dependency_graph'):
-                graph_path = viz_gen.generate_dependency_graph(
-                    results['dependencies']['dependency_graph']
-                )
-                if graph_path:
-                    logger.info(f"📊 Dependency graph: {graph_path}")
-            
-            # Generate complexity chart
-            chart_path = viz_gen.generate_complexity_chart(results['files'])
-            if chart_path:
-                logger.info(f"📊 Complexity chart: {chart_path}")
-            
-            # Generate metrics summary
-            summary_path = viz_gen.generate_metrics_summary(results['summary'])
-            if summary_path:
-                logger.info(f"📊 Metrics summary: {summary_path}")
+            jobs.append(generate_graphs)
+        
+        html_report_path = None
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = {executor.submit(job, results, archaeologist.output_dir): job
+                           for job in jobs}
+                for future in as_completed(futures):
+                    for label, path in future.result():
+                        if path:
+                            logger.info(f"{label}: {path}")
+                    if futures[future] is generate_html:
+                        html_report_path = future.result()[0][1]
+        
+        # Make sure the JSON results have been written
+        archaeologist.flush()
         
         # Success message
         if not args.quiet:
-            print("✅ Analysis complete!")
-            print(f"\n📂 Results saved to: {archaeologist.output_dir}")
+            lines = ["✅ Analysis complete!", f"\n📂 Results saved to: {archaeologist.output_dir}"]
             if args.format in ['json', 'all']:
-                print(f"   ├─ JSON:        {archaeologist.output_dir}/reports/analysis_results.json")
+                lines.append(f"   ├─ JSON:        {archaeologist.output_dir}/reports/analysis_results.json")
             if not args.no_report and args.format in ['markdown', 'all']:
-                print(f"   ├─ Markdown:    {archaeologist.output_dir}/reports/analysis_report.md")
+                lines.append(f"   ├─ Markdown:    {archaeologist.output_dir}/reports/analysis_report.md")
             if not args.no_report and args.format in ['html', 'all']:
-                print(f"   ├─ HTML:        {archaeologist.output_dir}/reports/analysis_report.html")
+                lines.append(f"   ├─ HTML:        {archaeologist.output_dir}/reports/analysis_report.html")
             if not args.no_visualize:
-                print(f"   └─ Graphs:      {archaeologist.output_dir}/graphs/")
-            print()
+                lines.append(f"   └─ Graphs:      {archaeologist.output_dir}/graphs/")
+            sys.stdout.write("\n".join(lines) + "\n\n")
+            sys.stdout.flush()
         
         # Open HTML report in browser if requested
         if args.open_html and html_report_path:
+            import threading
             import webbrowser
-            webbrowser.open(f'file://{Path(html_report_path).absolute()}')
-            logger.info("🌐 Opened HTML report in browser")
+            # Launch the browser in the background; the thread is not a
+            # daemon so the interpreter still lets the launch finish on exit
+            url = f'file://{Path(html_report_path).absolute()}'
+            threading.Thread(target=webbrowser.open, args=(url,),
+                             name='open-html-report').start()
+            logger.info("🌐 Opening HTML report in browser")
         
         return 0
         
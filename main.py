@@ -3,21 +3,113 @@ Codebase Archaeologist - Main Orchestrator
 Coordinates all modules to analyze codebase
 """
 
+import os
+import heapq
 import json
+import logging
+import multiprocessing
+import pickle
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List
-from tqdm import tqdm
+from typing import Dict, List, Optional
+
+# orjson is optional; it encodes in C, including indented output
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 from src.utils.logger import setup_logger, logger
-from src.utils.helpers import load_config, create_output_dir
-from src.ingestion.code_loader import CodeLoader
+from src.utils.helpers import load_config, create_output_dir, ensure_dir
+from src.ingestion.code_loader import CodeLoader, load_content
 from src.analysis.ast_parser import ASTParser
 from src.analysis.complexity_analyzer import ComplexityAnalyzer
 from src.extraction.dependency_extractor import DependencyExtractor
 from src.extraction.code_smell_detector import CodeSmellDetector
 from src.ai_engine.code_summarizer import CodeSummarizer
 
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 20
+
+# Per-process analysis modules, built once by _init_worker
+_worker_modules = None
+
+def _init_worker(config: Dict, ast_cache_dir: Optional[str]):
+    """Build the per-file analysis modules once in each worker process"""
+    global _worker_modules
+    smell_detector = CodeSmellDetector(config)
+    smell_detector.precompile()
+    _worker_modules = (
+        ASTParser(ast_cache_dir),
+        ComplexityAnalyzer(config),
+        smell_detector,
+        CodeSummarizer(config)
+    )
+
+def _analyze_file_in_worker(file_data: Dict) -> Dict:
+    """Analyze a single file using the worker's analysis modules"""
+    return _run_file_analysis(*_worker_modules, file_data)
+
+def _run_file_analysis(parser: ASTParser,
+                       complexity_analyzer: ComplexityAnalyzer,
+                       smell_detector: CodeSmellDetector,
+                       summarizer: CodeSummarizer,
+                       file_data: Dict) -> Dict:
+    """
+    Analyze a single file
+    
+    Args:
+        parser: AST parser
+        complexity_analyzer: Complexity analyzer
+        smell_detector: Code smell detector
+        summarizer: Code summarizer
+        file_data: File information from CodeLoader
+        
+    Returns:
+        Complete analysis of the file
+    """
+    filepath = file_data['path']
+    try:
+        content = load_content(file_data)
+        
+        # Parse AST once; the complexity analyzer reuses the tree
+        parsed = parser.parse_file(filepath, content, keep_tree=True)
+        tree = parsed.pop('_ast', None)
+        
+        # Analyze complexity
+        complexity = complexity_analyzer.analyze_file(filepath, content, tree=tree)
+        
+        # Detect code smells
+        smells = smell_detector.detect_smells(parsed, content)
+        
+        # Generate AI summaries
+        documentation = summarizer.generate_documentation(parsed)
+    except Exception as e:
+        # An empty record for this file rather than failing the whole batch
+        logger.error(f"Error analyzing {filepath}: {e}")
+        parsed = {**parser._empty_result(filepath), 'error': str(e)}
+        complexity = complexity_analyzer._empty_result(filepath)
+        smells = smell_detector.detect_smells(parsed, '')
+        documentation = summarizer.generate_documentation(parsed)
+    
+    # Combine all data
+    return {
+        **parsed,
+        'file_info': {
+            'name': file_data['name'],
+            'relative_path': file_data['relative_path'],
+            'lines': file_data['lines'],
+            'size': file_data['size']
+        },
+        'complexity': complexity,
+        'code_smells': smells,
+        'documentation': documentation
+    }
+
 class CodebaseArchaeologist:
     """
     Main orchestrator for codebase analysis
@@ -48,12 +140,25 @@ class CodebaseArchaeologist:
         
         # Initialize modules
         self.loader = CodeLoader(self.config)
-        self.parser = ASTParser()
+        # The on-disk parse cache is only used by runs that persist results
+        self.ast_cache_dir = (self.config['analysis'].get('ast_cache_dir')
+                              if save_to_disk else None)
+        self.ast_cache_max_mb = self.config['analysis'].get('ast_cache_max_mb', 256)
+        self.parser = ASTParser(self.ast_cache_dir)
         self.complexity_analyzer = ComplexityAnalyzer(self.config)
         self.dependency_extractor = DependencyExtractor()
         self.smell_detector = CodeSmellDetector(self.config)
+        self.smell_detector.precompile()
         self.summarizer = CodeSummarizer(self.config)
         
+        # Worker processes for per-file analysis
+        self.max_workers = self.config['analysis'].get('max_workers') or os.cpu_count() or 1
+        self.start_method = self.config['analysis'].get('start_method')
+        
+        # Background writer for result files (created on first save)
+        self._writer = None
+        self._pending_writes = []
+        
         # Create output directory only if saving to disk
         if self.save_to_disk:
             self.output_dir = create_output_dir(self.config['output']['base_dir'])
@@ -85,11 +190,8 @@ class CodebaseArchaeologist:
         
         # Step 2: Parse and analyze files
         logger.info("📊 Parsing and analyzing files...")
-        all_parsed = []
-        
-        for file_data in tqdm(files, desc="Analyzing files"):
-            parsed = self._analyze_file(file_data)
-            all_parsed.append(parsed)
+        all_parsed = self._analyze_files(files)
+        self.parser.prune_cache(self.ast_cache_max_mb * 1024 * 1024)
         
         # Step 3: Extract dependencies
         logger.info("🔗 Extracting dependencies...")
@@ -118,10 +220,9 @@ class CodebaseArchaeologist:
             'summary': self._generate_summary(all_parsed, dependency_data, repo_complexity)
         }
         
-        # Step 7: Save results (only if save_to_disk is enabled)
+        # Step 7: Save results in the background (only if save_to_disk is enabled)
         if self.save_to_disk:
             self._save_results(results)
-            logger.info(f"📄 Results saved to: {self.output_dir}")
         
         logger.info(f"✅ Analysis complete in {results['metadata']['analysis_time_seconds']}s")
         
@@ -145,64 +246,92 @@ class CodebaseArchaeologist:
         # Continue with normal analysis
         return self.analyze_local(codebase_data['source'])
     
-    def _analyze_file(self, file_data: Dict) -> Dict:
+    def _analyze_files(self, files: List[Dict]) -> List[Dict]:
         """
-        Analyze a single file
+        Analyze all files, in parallel when the batch is large enough
         
         Args:
-            file_data: File information with content
+            files: File information from CodeLoader
             
         Returns:
-            Complete analysis of the file
+            Per-file analysis results, in input order
         """
-        filepath = file_data['path']
-        content = file_data['content']
-        
-        # Parse AST
-        parsed = self.parser.parse_file(filepath, content)
-        
-        # Analyze complexity
-        complexity = self.complexity_analyzer.analyze_file(filepath, content)
+        workers = min(self.max_workers, len(files))
+        
+        if workers > 1 and len(files) >= PARALLEL_MIN_FILES:
+            chunksize = max(1, len(files) // (4 * workers))
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=self._pool_context(),
+                                         initializer=_init_worker,
+                                         initargs=(self.config, self.ast_cache_dir)) as executor:
+                    results = executor.map(_analyze_file_in_worker, files, chunksize=chunksize)
+                    return list(self._progress(results, len(files)))
+            except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+                logger.warning(f"Parallel analysis failed ({e}), falling back to sequential")
+        
+        return [self._analyze_file(file_data)
+                for file_data in self._progress(files, len(files))]
+    
+    def _pool_context(self):
+        """
+        Get the multiprocessing context for the worker pool
         
-        # Detect code smells
-        smells = self.smell_detector.detect_smells(parsed, content)
+        Forking a process that runs other threads (such as the Streamlit
+        dashboard) can deadlock the workers, so unless analysis.start_method
+        is set such processes spawn them instead.
+        """
+        method = self.start_method
+        if method is None and threading.active_count() > 1:
+            method = 'spawn'
+        return multiprocessing.get_context(method)
+    
+    @staticmethod
+    def _progress(iterable, total: int):
+        """
+        Wrap an iterable in a progress bar when INFO output is enabled
         
-        # Generate AI summaries
-        documentation = self.summarizer.generate_documentation(parsed)
+        tqdm is imported on demand so quiet runs never load it.
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return iterable
+        from tqdm import tqdm
+        return tqdm(iterable, total=total, desc="Analyzing files")
+    
+    def _analyze_file(self, file_data: Dict) -> Dict:
+        """
+        Analyze a single file
         
-        # Combine all data
-        return {
-            **parsed,
-            'file_info': {
-                'name': file_data['name'],
-                'relative_path': file_data['relative_path'],
-                'lines': file_data['lines'],
-                'size': file_data['size']
-            },
-            'complexity': complexity,
-            'code_smells': smells,
-            'documentation': documentation
-        }
+        Args:
+            file_data: File information from CodeLoader
+            
+        Returns:
+            Complete analysis of the file
+        """
+        return _run_file_analysis(self.parser, self.complexity_analyzer,
+                                  self.smell_detector, self.summarizer, file_data)
     
     def _generate_summary(self, all_parsed: List[Dict], 
                          dependency_data: Dict, 
                          repo_complexity: Dict) -> Dict:
         """Generate high-level repository summary"""
         
-        total_functions = sum(len(f['functions']) for f in all_parsed)
-        total_classes = sum(len(f['classes']) for f in all_parsed)
-        total_lines = sum(f['file_info']['lines'] for f in all_parsed)
-        
-        # Code smell statistics
-        total_smells = sum(f['code_smells']['total_smell_count'] for f in all_parsed)
-        
-        # Most complex files
-        complex_files = sorted(
-            [(f['filepath'], f['complexity']['cyclomatic_complexity']['average']) 
-             for f in all_parsed],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+        # Accumulate all counters in a single pass over the files
+        total_functions = total_classes = total_lines = total_smells = 0
+        for f in all_parsed:
+            total_functions += len(f['functions'])
+            total_classes += len(f['classes'])
+            total_lines += f['file_info']['lines']
+            total_smells += f['code_smells']['total_smell_count']
+        
+        # Most complex files (top 5 without sorting the whole list)
+        complex_files = [
+            (f['filepath'], f['complexity']['cyclomatic_complexity']['average'])
+            for f in heapq.nlargest(
+                5, all_parsed,
+                key=lambda f: f['complexity']['cyclomatic_complexity']['average']
+            )
+        ]
         
         return {
             'total_functions': total_functions,
@@ -221,29 +350,57 @@ class CodebaseArchaeologist:
         }
     
     def _save_results(self, results: Dict):
-        """Save analysis results to JSON file"""
-        reports_dir = self.output_dir / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-        output_file = reports_dir / "analysis_results.json"
+        """
+        Queue analysis results to be written to a JSON file
         
-        # Convert non-serializable objects
-        serializable_results = self._make_serializable(results)
+        The file is written on a background thread straight from
+        ``results``, so callers may read but must not modify them until
+        flush() returns.
+        """
+        reports_dir = ensure_dir(self.output_dir / "reports")
+        output_file = reports_dir / "analysis_results.json"
         
-        with open(output_file, 'w') as f:
-            json.dump(serializable_results, f, indent=2)
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='results-writer')
+        self._pending_writes.append(
+            self._writer.submit(self._write_json, output_file, results)
+        )
+    
+    def _write_json(self, output_file: Path, data: Dict):
+        """Write JSON data to file, recreating its directory if it was removed"""
+        try:
+            self._dump_json(output_file, data)
+        except FileNotFoundError:
+            ensure_dir(output_file.parent, refresh=True)
+            self._dump_json(output_file, data)
         
         logger.info(f"Results saved to: {output_file}")
     
-    def _make_serializable(self, obj):
-        """Convert objects to JSON-serializable format"""
-        if isinstance(obj, dict):
-            return {k: self._make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._make_serializable(item) for item in obj]
-        elif hasattr(obj, '__dict__'):
-            return str(obj)
+    def _dump_json(self, output_file: Path, data: Dict):
+        """Write JSON data to file in a single serialization pass"""
+        if HAS_ORJSON:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    data,
+                    default=self._json_default,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
         else:
-            return obj
+            with open(output_file, 'w') as f:
+                json.dump(data, f, indent=2, default=self._json_default)
+    
+    def flush(self):
+        """Block until all queued result files have been written"""
+        pending, self._pending_writes = self._pending_writes, []
+        for future in pending:
+            future.result()
+    
+    @staticmethod
+    def _json_default(obj):
+        """Convert objects the JSON encoder cannot handle (e.g. graphs)"""
+        if hasattr(obj, '__dict__'):
+            return str(obj)
+        return repr(obj)
 
 def main():
     """Main entry point"""
@@ -264,6 +421,7 @@ def main():
         results = archaeologist.analyze_github(args.path)
     else:
         results = archaeologist.analyze_local(args.path)
+    archaeologist.flush()
     
     # Print summary
     print("\n" + "="*60)
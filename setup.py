@@ -54,6 +54,10 @@ setup(
             'streamlit>=1.22.0',
             'flask>=2.3.0',
         ],
+        'speedups': [
+            'scipy>=1.8.0',
+            'orjson>=3.9.0',
+        ],
     },
     
     entry_points={
@@ -12,13 +12,18 @@ A comprehensive tool for analyzing legacy codebases:
 __version__ = "1.0.0"
 __author__ = "Codebase Archaeologist Team"
 
-from src.analysis.ast_parser import ASTParser
-from src.analysis.complexity_analyzer import ComplexityAnalyzer
-from src.analysis.metrics_calculator import MetricsCalculator
-from src.ingestion.code_loader import CodeLoader
-from src.extraction.dependency_extractor import DependencyExtractor
-from src.extraction.code_smell_detector import CodeSmellDetector
-from src.ai_engine.code_summarizer import CodeSummarizer
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'ASTParser': 'src.analysis.ast_parser',
+    'ComplexityAnalyzer': 'src.analysis.complexity_analyzer',
+    'MetricsCalculator': 'src.analysis.metrics_calculator',
+    'CodeLoader': 'src.ingestion.code_loader',
+    'DependencyExtractor': 'src.extraction.dependency_extractor',
+    'CodeSmellDetector': 'src.extraction.code_smell_detector',
+    'CodeSummarizer': 'src.ai_engine.code_summarizer'
+}
 
 __all__ = [
     'ASTParser',
@@ -29,3 +34,5 @@ __all__ = [
     'CodeSmellDetector',
     'CodeSummarizer'
 ]
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
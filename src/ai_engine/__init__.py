@@ -2,8 +2,15 @@
 AI Engine module - Code summarization and ML models
 """
 
-from src.ai_engine.code_summarizer import CodeSummarizer
-from src.ai_engine.model_manager import ModelManager
-from src.ai_engine.prompt_templates import PromptTemplates
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'CodeSummarizer': 'src.ai_engine.code_summarizer',
+    'ModelManager': 'src.ai_engine.model_manager',
+    'PromptTemplates': 'src.ai_engine.prompt_templates'
+}
 
 __all__ = ['CodeSummarizer', 'ModelManager', 'PromptTemplates']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
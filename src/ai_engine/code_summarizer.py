@@ -3,10 +3,90 @@ Code Summarizer Module
 Generate natural language explanations using AI
 """
 
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 import re
 from src.utils.logger import logger
 
+# Implicit first parameters left out of parameter listings
+_IMPLICIT_PARAMS = frozenset(('self', 'cls'))
+
+# Name prefix -> purpose, used by _infer_purpose_from_name
+_PREFIX_PURPOSES = {
+    'get': "retrieves data",
+    'fetch': "retrieves data",
+    'set': "updates data",
+    'update': "updates data",
+    'create': "creates new data or objects",
+    'make': "creates new data or objects",
+    'delete': "removes data",
+    'remove': "removes data",
+    'validate': "validates data or conditions",
+    'check': "validates data or conditions",
+    'calculate': "performs calculations",
+    'compute': "performs calculations",
+    'parse': "processes data",
+    'process': "processes data",
+    'save': "saves or writes data",
+    'write': "saves or writes data",
+    'load': "loads or reads data",
+    'read': "loads or reads data",
+}
+_PREFIX_RE = re.compile('|'.join(sorted(_PREFIX_PURPOSES, key=len, reverse=True)))
+
+# Name keyword -> purpose, checked in order when no prefix matches
+# ('handle' also covers 'handler')
+_KEYWORD_PURPOSES = (
+    ('handle', "handles events or requests"),
+    ('manager', "manages resources or operations"),
+    ('controller', "controls application logic"),
+    ('helper', "provides utility functions"),
+    ('util', "provides utility functions"),
+)
+
+@lru_cache(maxsize=4096)
+def _purpose_from_name(name: str) -> Optional[str]:
+    """Infer purpose from function/class name (memoized; names repeat a lot)"""
+    name_lower = name.lower()
+    
+    # Common verb prefixes (none is a prefix of another, so at most one matches)
+    match = _PREFIX_RE.match(name_lower)
+    if match:
+        return _PREFIX_PURPOSES[match.group()]
+    
+    # Role keywords anywhere in the name, in priority order
+    for keyword, purpose in _KEYWORD_PURPOSES:
+        if keyword in name_lower:
+            return purpose
+    
+    return None
+
+@lru_cache(maxsize=4096)
+def _file_purpose(filename: str, has_classes: bool, has_functions: bool) -> Optional[str]:
+    """Infer file purpose from its name and whether it defines classes/functions"""
+    name_lower = filename.lower()
+    
+    if 'test' in name_lower:
+        return "This appears to be a test file"
+    elif 'config' in name_lower or 'settings' in name_lower:
+        return "This file contains configuration settings"
+    elif 'util' in name_lower or 'helper' in name_lower:
+        return "This file provides utility functions"
+    elif 'model' in name_lower:
+        return "This file defines data models"
+    elif 'view' in name_lower:
+        return "This file handles view logic"
+    elif 'controller' in name_lower:
+        return "This file contains controller logic"
+    elif 'main' in name_lower or '__main__' in name_lower:
+        return "This is the main entry point"
+    elif has_classes and not has_functions:
+        return "This file primarily defines classes"
+    elif has_functions and not has_classes:
+        return "This file primarily defines functions"
+    
+    return None
+
 class CodeSummarizer:
     """
     Generate code summaries and explanations
@@ -58,38 +138,32 @@ class CodeSummarizer:
             return f"Function '{name}': {docstring}"
         
         # Otherwise, generate summary
-        summary_parts = []
-        
-        # Async indicator
-        if is_async:
-            summary_parts.append("This asynchronous function")
-        else:
-            summary_parts.append("This function")
+        summary = "This asynchronous function" if is_async else "This function"
         
         # Infer purpose from name
         purpose = self._infer_purpose_from_name(name)
         if purpose:
-            summary_parts.append(purpose)
+            summary += f". {purpose}"
         
         # Parameters
         if params:
-            filtered_params = [p for p in params if p not in ['self', 'cls']]
+            filtered_params = [p for p in params if p not in _IMPLICIT_PARAMS]
             if filtered_params:
-                summary_parts.append(f"takes {len(filtered_params)} parameter(s): {', '.join(filtered_params)}")
+                summary += f". takes {len(filtered_params)} parameter(s): {', '.join(filtered_params)}"
         else:
-            summary_parts.append("takes no parameters")
+            summary += ". takes no parameters"
         
         # Returns
         if returns:
-            summary_parts.append(f"and returns {returns}")
+            summary += f". and returns {returns}"
         
         # Function calls
         if calls and len(calls) <= 5:
-            summary_parts.append(f"It calls: {', '.join(calls[:5])}")
+            summary += f". It calls: {', '.join(calls[:5])}"
         elif calls:
-            summary_parts.append(f"It makes {len(calls)} function calls")
+            summary += f". It makes {len(calls)} function calls"
         
-        return '. '.join(summary_parts) + '.'
+        return summary + '.'
     
     def summarize_class(self, class_data: Dict) -> str:
         """
@@ -111,27 +185,27 @@ class CodeSummarizer:
             return f"Class '{name}': {docstring}"
         
         # Generate summary
-        summary_parts = [f"Class '{name}'"]
+        summary = f"Class '{name}'"
         
         # Inheritance
         if bases:
-            summary_parts.append(f"inherits from {', '.join(bases)}")
+            summary += f" inherits from {', '.join(bases)}"
         
         # Methods
         if methods:
-            summary_parts.append(f"and implements {len(methods)} methods")
+            summary += f" and implements {len(methods)} methods"
             
             # List key methods
             key_methods = [m for m in methods if not m.startswith('_')]
             if key_methods:
-                summary_parts.append(f"including: {', '.join(key_methods[:5])}")
+                summary += f" including: {', '.join(key_methods[:5])}"
         
         # Infer purpose
         purpose = self._infer_purpose_from_name(name)
         if purpose:
-            summary_parts.append(f". {purpose}")
+            summary += f" . {purpose}"
         
-        return ' '.join(summary_parts) + '.'
+        return summary + '.'
     
     def summarize_file(self, parsed_data: Dict) -> str:
         """
@@ -144,95 +218,61 @@ class CodeSummarizer:
             Natural language summary
         """
         filepath = parsed_data.get('filepath', 'unknown')
-        filename = filepath.split('/')[-1]
-        
         functions = parsed_data.get('functions', [])
-        classes = parsed_data.get('classes', [])
-        imports = parsed_data.get('imports', [])
         
-        summary_parts = [f"File '{filename}'"]
+        return self._summarize_file_parts(
+            filepath.rpartition('/')[2],
+            parsed_data.get('classes', []),
+            functions,
+            parsed_data.get('imports', []),
+            [f for f in functions if not f.get('parent_class')]
+        )
+    
+    def _summarize_file_parts(self, filename: str, classes: List[Dict],
+                              functions: List[Dict], imports: List[Dict],
+                              standalone_funcs: List[Dict]) -> str:
+        """
+        Summarize a file from already extracted parts
+        
+        Args:
+            filename: File name without directories
+            classes: Class metadata
+            functions: All function and method metadata
+            imports: Import metadata
+            standalone_funcs: Functions that are not methods
+            
+        Returns:
+            Natural language summary
+        """
+        summary = f"File '{filename}'"
         
         # Classes
         if classes:
             class_names = [c['name'] for c in classes]
-            summary_parts.append(f"defines {len(classes)} class(es): {', '.join(class_names)}")
+            summary += f" defines {len(classes)} class(es): {', '.join(class_names)}"
         
         # Functions
-        if functions:
-            # Filter out methods
-            standalone_funcs = [f for f in functions if not f.get('parent_class')]
-            if standalone_funcs:
-                summary_parts.append(f"and {len(standalone_funcs)} function(s)")
+        if standalone_funcs:
+            summary += f" and {len(standalone_funcs)} function(s)"
         
         # Imports
         if imports:
-            summary_parts.append(f"It imports {len(imports)} module(s)")
+            summary += f" It imports {len(imports)} module(s)"
         
         # Infer file purpose
         file_purpose = self._infer_file_purpose(filename, classes, functions)
         if file_purpose:
-            summary_parts.append(f". {file_purpose}")
+            summary += f" . {file_purpose}"
         
-        return ' '.join(summary_parts) + '.'
+        return summary + '.'
     
     def _infer_purpose_from_name(self, name: str) -> Optional[str]:
         """Infer purpose from function/class name"""
-        name_lower = name.lower()
-        
-        # Common patterns
-        if name_lower.startswith('get') or name_lower.startswith('fetch'):
-            return "retrieves data"
-        elif name_lower.startswith('set') or name_lower.startswith('update'):
-            return "updates data"
-        elif name_lower.startswith('create') or name_lower.startswith('make'):
-            return "creates new data or objects"
-        elif name_lower.startswith('delete') or name_lower.startswith('remove'):
-            return "removes data"
-        elif name_lower.startswith('validate') or name_lower.startswith('check'):
-            return "validates data or conditions"
-        elif name_lower.startswith('calculate') or name_lower.startswith('compute'):
-            return "performs calculations"
-        elif name_lower.startswith('parse') or name_lower.startswith('process'):
-            return "processes data"
-        elif name_lower.startswith('save') or name_lower.startswith('write'):
-            return "saves or writes data"
-        elif name_lower.startswith('load') or name_lower.startswith('read'):
-            return "loads or reads data"
-        elif 'handler' in name_lower or 'handle' in name_lower:
-            return "handles events or requests"
-        elif 'manager' in name_lower:
-            return "manages resources or operations"
-        elif 'controller' in name_lower:
-            return "controls application logic"
-        elif 'helper' in name_lower or 'util' in name_lower:
-            return "provides utility functions"
-        
-        return None
+        return _purpose_from_name(name)
     
     def _infer_file_purpose(self, filename: str, classes: List, functions: List) -> Optional[str]:
         """Infer file purpose from name and contents"""
-        name_lower = filename.lower()
-        
-        if 'test' in name_lower:
-            return "This appears to be a test file"
-        elif 'config' in name_lower or 'settings' in name_lower:
-            return "This file contains configuration settings"
-        elif 'util' in name_lower or 'helper' in name_lower:
-            return "This file provides utility functions"
-        elif 'model' in name_lower:
-            return "This file defines data models"
-        elif 'view' in name_lower:
-            return "This file handles view logic"
-        elif 'controller' in name_lower:
-            return "This file contains controller logic"
-        elif 'main' in name_lower or '__main__' in name_lower:
-            return "This is the main entry point"
-        elif classes and not functions:
-            return "This file primarily defines classes"
-        elif functions and not classes:
-            return "This file primarily defines functions"
-        
-        return None
+        return _file_purpose(filename, bool(classes), bool(functions))
     
     def generate_documentation(self, parsed_data: Dict) -> Dict:
         """
@@ -244,24 +284,64 @@ class CodeSummarizer:
         Returns:
             Structured documentation
         """
-        return {
-            'file_summary': self.summarize_file(parsed_data),
-            'classes': [
-                {
-                    'name': cls['name'],
-                    'summary': self.summarize_class(cls),
-                    'methods': cls.get('method_names', [])
-                }
-                for cls in parsed_data.get('classes', [])
-            ],
-            'functions': [
-                {
-                    'name': func['name'],
-                    'summary': self.summarize_function(func),
-                    'parameters': func.get('parameters', []),
-                    'returns': func.get('returns')
-                }
-                for func in parsed_data.get('functions', [])
-                if not func.get('parent_class')  # Only standalone functions
-            ]
-        }
\ No newline at end of file
+        documentation = {'file_summary': None, 'classes': [], 'functions': []}
+        for kind, entry in self.iter_documentation(parsed_data):
+            if kind == 'file':
+                documentation['file_summary'] = entry['summary']
+            elif kind == 'class':
+                documentation['classes'].append(entry)
+            else:
+                documentation['functions'].append(entry)
+        return documentation
+    
+    def iter_documentation(self, parsed_data: Dict) -> Iterator[Tuple[str, Dict]]:
+        """
+        Lazily generate documentation entries for a file
+        
+        Yields one entry at a time so callers can stream them out
+        without building the whole documentation dict.
+        
+        Args:
+            parsed_data: Complete parsed file data
+            
+        Yields:
+            ('file', {'summary': ...}) first, then ('class', entry) and
+            ('function', entry) tuples shaped like generate_documentation's
+        """
+        filepath = parsed_data.get('filepath', 'unknown')
+        classes = parsed_data.get('classes', [])
+        functions = parsed_data.get('functions', [])
+        standalone_funcs = [f for f in functions if not f.get('parent_class')]
+        
+        yield 'file', {
+            'summary': self._summarize_file_parts(
+                filepath.rpartition('/')[2],
+                classes,
+                functions,
+                parsed_data.get('imports', []),
+                standalone_funcs
+            )
+        }
+        for entry in self._iter_classes(classes):
+            yield 'class', entry
+        for entry in self._iter_functions(standalone_funcs):
+            yield 'function', entry
+    
+    def _iter_classes(self, classes: List[Dict]) -> Iterator[Dict]:
+        """Yield documentation entries for classes"""
+        for cls in classes:
+            yield {
+                'name': cls['name'],
+                'summary': self.summarize_class(cls),
+                'methods': cls.get('method_names', [])
+            }
+    
+    def _iter_functions(self, functions: List[Dict]) -> Iterator[Dict]:
+        """Yield documentation entries for standalone functions"""
+        for func in functions:
+            yield {
+                'name': func['name'],
+                'summary': self.summarize_function(func),
+                'parameters': func.get('parameters', []),
+                'returns': func.get('returns')
+            }
@@ -5,9 +5,24 @@ This is a placeholder for future ML model integration
 """
 
 import os
-from typing import Optional, Dict, Any
+import zlib
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from src.utils.logger import logger
 
+# Try to import numpy for vectorized MinHash (ships with matplotlib)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Fallback similarity methods when no model is loaded: exact Jaccard, or
+# a MinHash estimate of it (needs numpy)
+SIMILARITY_METHODS = ('exact', 'minhash')
+MINHASH_PERMUTATIONS = 128
+
 class ModelManager:
     """
     Manage AI models for code analysis
@@ -29,10 +44,28 @@ class ModelManager:
         self.config = config
         self.model_name = config.get('ai', {}).get('model_name', 'microsoft/codebert-base')
         self.use_local_model = config.get('ai', {}).get('use_local_model', False)
+        self.compile_model = config.get('ai', {}).get('compile_model', False)
+        self.half_precision = config.get('ai', {}).get('half_precision', False)
+        self.quantize = config.get('ai', {}).get('quantize', False)
+        self.max_length = config.get('ai', {}).get('max_token_length', 512)
         self.model = None
         self.tokenizer = None
         self.device = 'cpu'  # Default to CPU
         
+        # torch module and cosine similarity, bound once by load_model()
+        self._torch = None
+        self._cosine = None
+        
+        # Pad inputs to max_length so a compiled model sees one static shape
+        self._static_shapes = False
+        
+        # Side CUDA stream for host-to-device input copies (GPU only)
+        self._copy_stream = None
+        
+        # LRU cache of CPU embeddings keyed by code content hash
+        self.embedding_cache_size = config.get('ai', {}).get('embedding_cache_size', 4096)
+        self._embedding_cache: OrderedDict = OrderedDict()
+        
         logger.info(f"ModelManager initialized (model: {self.model_name})")
     
     def load_model(self) -> bool:
@@ -58,24 +91,45 @@ class ModelManager:
                 )
                 return False
             
+            # Keep torch handy so the inference methods skip the import lookup
+            self._torch = torch
+            self._cosine = torch.nn.functional.cosine_similarity
+            
             logger.info(f"Loading model: {self.model_name}")
             
             # Load tokenizer
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             
             # Load model
-            self.model = AutoModel.from_pretrained(self.model_name)
+            self.model = self._load_pretrained(AutoModel, torch)
             
             # Set device (GPU if available)
             if torch.cuda.is_available():
                 self.device = 'cuda'
-                self.model = self.model.to(self.device)
+                # 8-bit models are placed on the GPU at load time and cannot be moved
+                if not getattr(self.model, 'is_loaded_in_8bit', False):
+                    self.model = self.model.to(self.device)
+                self._copy_stream = torch.cuda.Stream(device=self.device)
                 logger.info("Model loaded on GPU")
             else:
                 logger.info("Model loaded on CPU")
             
             self.model.eval()  # Set to evaluation mode
             
+            # int8 dynamic quantization of the Linear layers on CPU
+            if self.quantize and self.device == 'cpu':
+                try:
+                    self.model = torch.ao.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                    logger.info("Model quantized to int8 (dynamic)")
+                except Exception as e:
+                    logger.warning(f"Dynamic quantization failed, using unquantized model: {e}")
+            
+            # Compile the forward pass into fused kernels
+            if self.compile_model and hasattr(torch, 'compile'):
+                self._compile(torch)
+            
             logger.info("Model loaded successfully")
             return True
             
@@ -83,6 +137,73 @@ class ModelManager:
             logger.error(f"Error loading model: {e}")
             return False
     
+    def _compile(self, torch):
+        """
+        Compile the loaded model with torch.compile
+        
+        torch.compile only compiles on the first call, so a warm-up forward
+        pass on a one-snippet batch runs here; if compiling or the warm-up
+        fails the eager model is kept.
+        
+        Args:
+            torch: The torch module
+        """
+        eager_model = self.model
+        mode = 'reduce-overhead' if self.device == 'cuda' else 'default'
+        try:
+            self.model = torch.compile(eager_model, mode=mode, dynamic=False)
+            self._static_shapes = True
+            self._forward(['pass'])
+            logger.info(f"Model compiled with torch.compile (mode={mode})")
+        except Exception as e:
+            self.model = eager_model
+            self._static_shapes = False
+            logger.warning(f"torch.compile failed, using eager model: {e}")
+    
+    def _load_pretrained(self, model_class, torch) -> Any:
+        """
+        Load the pretrained model in the most compact supported format
+        
+        On GPU with quantization enabled the model is loaded in 8-bit via
+        bitsandbytes. Otherwise, with half_precision enabled, it is loaded
+        in half precision with SDPA attention: fp16 on GPU and bf16 on CPU
+        (fp16 softmax is unstable on CPU). On CPU with quantization enabled the model stays fp32 here,
+        since dynamic int8 quantization needs fp32 Linear weights. Each
+        step falls back to a plain load if the options are rejected.
+        
+        Args:
+            model_class: transformers auto class used to load the model
+            torch: The torch module
+            
+        Returns:
+            Loaded model
+        """
+        on_gpu = torch.cuda.is_available()
+        
+        if self.quantize and on_gpu:
+            try:
+                from transformers import BitsAndBytesConfig
+                return model_class.from_pretrained(
+                    self.model_name,
+                    quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                    device_map={'': 0}
+                )
+            except (TypeError, ValueError, ImportError) as e:
+                logger.warning(f"8-bit load failed, trying half precision: {e}")
+        
+        if self.half_precision and (on_gpu or not self.quantize):
+            dtype = torch.float16 if on_gpu else torch.bfloat16
+            try:
+                return model_class.from_pretrained(
+                    self.model_name,
+                    torch_dtype=dtype,
+                    attn_implementation='sdpa'
+                )
+            except (TypeError, ValueError, ImportError) as e:
+                logger.warning(f"Half precision/SDPA load failed, using defaults: {e}")
+        
+        return model_class.from_pretrained(self.model_name)
+    
     def encode_code(self, code: str) -> Optional[Any]:
         """
         Encode code snippet into embeddings
@@ -93,36 +214,105 @@ class ModelManager:
         Returns:
             Code embeddings or None if model not loaded
         """
+        return self.encode_code_batch([code])
+    
+    def encode_code_batch(self, codes: List[str]) -> Optional[Any]:
+        """
+        Encode several code snippets with one tokenizer call and one forward pass
+        
+        Embeddings are cached by content hash; only snippets not seen
+        before are sent through the model.
+        
+        Args:
+            codes: Source code strings
+            
+        Returns:
+            Embeddings tensor of shape [len(codes), hidden] or None if model not loaded
+        """
         if self.model is None or self.tokenizer is None:
             logger.warning("Model not loaded. Call load_model() first.")
             return None
         
         try:
-            import torch
-            
-            # Tokenize
-            inputs = self.tokenizer(
-                code,
-                return_tensors='pt',
-                max_length=512,
-                truncation=True,
-                padding=True
-            )
-            
-            # Move to device
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            torch = self._torch
+            keys = [self._code_key(code) for code in codes]
             
-            # Get embeddings
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
+            # Encode each distinct uncached snippet once
+            pending = {}
+            for key, code in zip(keys, codes):
+                if key in self._embedding_cache:
+                    self._embedding_cache.move_to_end(key)
+                elif key not in pending:
+                    pending[key] = code
             
-            return embeddings
+            fresh = {}
+            if pending:
+                embeddings = self._forward(list(pending.values()))
+                for key, embedding in zip(pending, embeddings.detach().cpu()):
+                    fresh[key] = embedding
+                    self._cache_embedding(key, embedding)
+            
+            rows = [fresh[key] if key in fresh else self._embedding_cache[key] for key in keys]
+            return torch.stack(rows).to(self.device)
             
         except Exception as e:
             logger.error(f"Error encoding code: {e}")
             return None
     
+    def _forward(self, codes: List[str]) -> Any:
+        """
+        Run the model on a batch of snippets
+        
+        Args:
+            codes: Source code strings
+            
+        Returns:
+            Mean-pooled embeddings of shape [len(codes), hidden]
+        """
+        torch = self._torch
+        
+        # Tokenize
+        inputs = self.tokenizer(
+            codes,
+            return_tensors='pt',
+            max_length=self.max_length,
+            truncation=True,
+            padding='max_length' if self._static_shapes else True
+        )
+        
+        # Move to device
+        if self._copy_stream is not None:
+            # Pinned, non-blocking copies on a side stream; the compute
+            # stream waits for them instead of the host blocking per tensor
+            compute_stream = torch.cuda.current_stream()
+            with torch.cuda.stream(self._copy_stream):
+                inputs = {k: v.pin_memory().to(self.device, non_blocking=True)
+                          for k, v in inputs.items()}
+            compute_stream.wait_stream(self._copy_stream)
+            for tensor in inputs.values():
+                tensor.record_stream(compute_stream)
+        else:
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        
+        # Get embeddings (mean over real tokens, ignoring batch padding)
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+            mask = inputs['attention_mask'].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            embeddings = (outputs.last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1)
+        
+        return embeddings
+    
+    @staticmethod
+    def _code_key(code: str) -> bytes:
+        """Content hash used as the embedding cache key"""
+        return hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def _cache_embedding(self, key: bytes, embedding: Any):
+        """Store an embedding (on CPU), evicting the least recently used entry"""
+        self._embedding_cache[key] = embedding
+        if len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+    
     def generate_summary(self, code: str, max_length: int = 50) -> str:
         """
         Generate natural language summary of code
@@ -168,24 +358,105 @@ class ModelManager:
             # Fallback to simple Jaccard similarity
             return self._jaccard_similarity(code1, code2)
         
-        try:
-            import torch
+        return self.calculate_similarities([(code1, code2)])[0]
+    
+    def calculate_similarities(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Calculate semantic similarity for many pairs of code snippets
+        
+        All snippets are encoded in one batch and the scores are copied
+        back from the device once, rather than synchronizing per pair.
+        
+        Args:
+            pairs: (code1, code2) tuples
             
-            # Encode both snippets
-            emb1 = self.encode_code(code1)
-            emb2 = self.encode_code(code2)
+        Returns:
+            Similarity score (0-1) for each pair, in order
+        """
+        if self.model is None:
+            return [self._jaccard_similarity(code1, code2) for code1, code2 in pairs]
+        
+        if not pairs:
+            return []
+        
+        try:
+            # Encode all snippets in one batch: rows alternate code1, code2
+            embeddings = self.encode_code_batch([code for pair in pairs for code in pair])
             
-            if emb1 is None or emb2 is None:
-                return 0.0
+            if embeddings is None:
+                return [0.0] * len(pairs)
             
-            # Calculate cosine similarity
-            cosine_sim = torch.nn.functional.cosine_similarity(emb1, emb2)
+            # Calculate cosine similarity row-wise, one device sync at the end
+            cosine_sim = self._cosine(embeddings[0::2], embeddings[1::2])
             
-            return float(cosine_sim.item())
+            return cosine_sim.float().cpu().tolist()
             
         except Exception as e:
             logger.error(f"Error calculating similarity: {e}")
-            return 0.0
+            return [0.0] * len(pairs)
+    
+    def calculate_similarity_matrix(self, codes: List[str], method: str = 'exact') -> 'np.ndarray':
+        """
+        Calculate pairwise similarity between many code snippets
+        
+        With a model loaded, all snippets are encoded in one batch and the
+        full matrix comes from a single matrix product of the normalized
+        embeddings, copied back from the device once. Without one, token
+        Jaccard similarity is used: exact, or estimated with MinHash
+        signatures (much faster for many snippets, but approximate).
+        
+        Args:
+            codes: Code snippets
+            method: Fallback method without a model, 'exact' or 'minhash'
+            
+        Returns:
+            NxN float array of similarity scores (0-1)
+        
+        Raises:
+            ValueError: If method is not one of SIMILARITY_METHODS
+            ImportError: If numpy is not installed
+        """
+        if method not in SIMILARITY_METHODS:
+            raise ValueError(f"Unknown similarity method {method!r}, expected one of {SIMILARITY_METHODS}")
+        if not HAS_NUMPY:
+            raise ImportError("calculate_similarity_matrix requires numpy")
+        
+        size = len(codes)
+        if self.model is None:
+            if method == 'minhash':
+                return self._minhash_similarity_matrix(codes)
+            return np.array([[self._jaccard_similarity(a, b) for b in codes] for a in codes],
+                            dtype=float).reshape(size, size)
+        
+        try:
+            embeddings = self.encode_code_batch(codes)
+            if embeddings is None:
+                return np.zeros((size, size))
+            
+            normalized = self._torch.nn.functional.normalize(embeddings, dim=1)
+            return (normalized @ normalized.T).float().cpu().numpy()
+            
+        except Exception as e:
+            logger.error(f"Error calculating similarity matrix: {e}")
+            return np.zeros((size, size))
+    
+    def similarity_matrix(self, codes: List[str], method: str = 'exact') -> List[List[float]]:
+        """
+        Calculate pairwise similarity as nested lists
+        
+        See calculate_similarity_matrix; without numpy only the exact
+        fallback (no model loaded) is available.
+        
+        Args:
+            codes: Code snippets
+            method: Fallback method without a model, 'exact' or 'minhash'
+            
+        Returns:
+            NxN matrix of similarity scores (0-1)
+        """
+        if not HAS_NUMPY and self.model is None and method == 'exact':
+            return [[self._jaccard_similarity(a, b) for b in codes] for a in codes]
+        return self.calculate_similarity_matrix(codes, method).tolist()
     
     def _jaccard_similarity(self, text1: str, text2: str) -> float:
         """
@@ -199,17 +470,58 @@ class ModelManager:
             Jaccard similarity (0-1)
         """
         # Tokenize by whitespace
-        tokens1 = set(text1.split())
-        tokens2 = set(text2.split())
-        
-        # Calculate Jaccard
-        intersection = tokens1.intersection(tokens2)
-        union = tokens1.union(tokens2)
+        tokens1 = frozenset(text1.split())
+        tokens2 = frozenset(text2.split())
         
-        if len(union) == 0:
+        if not tokens1 or not tokens2:
             return 0.0
         
-        return len(intersection) / len(union)
+        # Calculate Jaccard; |A ∪ B| = |A| + |B| - |A ∩ B| saves building the union
+        intersection = len(tokens1 & tokens2)
+        return intersection / (len(tokens1) + len(tokens2) - intersection)
+    
+    def _minhash_similarity_matrix(self, codes: List[str],
+                                   num_perm: int = MINHASH_PERMUTATIONS) -> 'np.ndarray':
+        """
+        Estimate pairwise Jaccard similarity with MinHash signatures
+        
+        Tokens are hashed once in Python; signatures and pairwise
+        comparisons run as numpy array operations, so each pair costs
+        num_perm comparisons instead of full set operations.
+        
+        Args:
+            codes: Code snippets
+            num_perm: Number of hash permutations per signature
+            
+        Returns:
+            NxN array of estimated Jaccard similarity (0-1)
+        """
+        rng = np.random.default_rng(0)
+        max_u64 = np.iinfo(np.uint64).max
+        a = rng.integers(0, max_u64, size=(num_perm, 1), dtype=np.uint64, endpoint=True) | np.uint64(1)
+        b = rng.integers(0, max_u64, size=(num_perm, 1), dtype=np.uint64, endpoint=True)
+        shift = np.uint64(32)
+        
+        empty = np.zeros(len(codes), dtype=bool)
+        signatures = np.empty((len(codes), num_perm), dtype=np.uint64)
+        for i, code in enumerate(codes):
+            tokens = {zlib.crc32(token.encode('utf-8', 'surrogatepass')) for token in code.split()}
+            if not tokens:
+                empty[i] = True
+                signatures[i] = max_u64
+                continue
+            x = np.fromiter(tokens, dtype=np.uint64, count=len(tokens))
+            # Multiply-shift hashing; uint64 arithmetic wraps modulo 2**64
+            signatures[i] = ((a * x + b) >> shift).min(axis=1)
+        
+        matrix = np.empty((len(codes), len(codes)))
+        for i in range(len(codes)):
+            matrix[i] = (signatures == signatures[i]).mean(axis=1)
+        
+        # Empty snippets have no tokens in common with anything
+        matrix[empty, :] = 0.0
+        matrix[:, empty] = 0.0
+        return matrix
     
     def unload_model(self):
         """Unload model to free memory"""
@@ -218,14 +530,13 @@ class ModelManager:
             del self.tokenizer
             self.model = None
             self.tokenizer = None
+            self._copy_stream = None
+            self._embedding_cache.clear()
             
             # Clear CUDA cache if available
-            try:
-                import torch
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-            except:
-                pass
+            torch = self._torch
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
             
             logger.info("Model unloaded")
     
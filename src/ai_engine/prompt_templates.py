@@ -5,6 +5,9 @@ Templates for generating prompts for LLMs (GPT, Claude, etc.)
 
 from typing import Dict, List
 
+# Number of leading characters of a file shown in file summary prompts
+FILE_PREVIEW_CHARS = 500
+
 class PromptTemplates:
     """Collection of prompt templates for code analysis"""
     
@@ -85,7 +88,8 @@ Summary:"""
         Generate prompt for file summarization
         
         Args:
-            file_content: Complete file content
+            file_content: File content (only the first FILE_PREVIEW_CHARS
+                characters are used, so a leading slice is enough)
             filename: Name of the file
             functions: List of function names
             classes: List of class names
@@ -104,7 +108,7 @@ Classes: {classes_str}
 
 Preview:
 ```python
-{file_content[:500]}...
+{file_content[:FILE_PREVIEW_CHARS]}...
 ```
 
 Provide a one-sentence summary that explains:
@@ -2,8 +2,15 @@
 Analysis module - Code parsing and metrics calculation
 """
 
-from src.analysis.ast_parser import ASTParser
-from src.analysis.complexity_analyzer import ComplexityAnalyzer
-from src.analysis.metrics_calculator import MetricsCalculator
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'ASTParser': 'src.analysis.ast_parser',
+    'ComplexityAnalyzer': 'src.analysis.complexity_analyzer',
+    'MetricsCalculator': 'src.analysis.metrics_calculator'
+}
 
 __all__ = ['ASTParser', 'ComplexityAnalyzer', 'MetricsCalculator']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
@@ -4,29 +4,131 @@ Parses Python code using Abstract Syntax Trees
 """
 
 import ast
-from typing import List, Dict, Optional, Set
+import hashlib
+import inspect
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, Dict, Optional, Set, Union
 from src.utils.logger import logger
 
+# Node classes checked in hot paths, bound once at import
+_AST = ast.AST
+_Name = ast.Name
+_Attribute = ast.Attribute
+_FunctionDef = ast.FunctionDef
+_AsyncFunctionDef = ast.AsyncFunctionDef
+_Expr = ast.Expr
+_Constant = ast.Constant
+
+def _source_text(node: ast.AST) -> str:
+    """
+    Render an expression as source, like ast.unparse
+    
+    Plain names and dotted attribute chains (the usual shape of calls,
+    decorators, bases and annotations) are joined directly and interned;
+    anything else goes through ast.unparse.
+    
+    Args:
+        node: Expression node
+        
+    Returns:
+        Source text of the expression
+    """
+    if node.__class__ is _Name:
+        return node.id
+    parts = []
+    current = node
+    while current.__class__ is _Attribute:
+        parts.append(current.attr)
+        current = current.value
+    if current.__class__ is _Name and parts:
+        parts.append(current.id)
+        parts.reverse()
+        # Dotted names repeat across functions; interning shares one
+        # object, which pickle (worker results) then writes once
+        return sys.intern('.'.join(parts))
+    return ast.unparse(node)
+
+def _docstring(node: ast.AST) -> Optional[str]:
+    """
+    Get a node's docstring, like ast.get_docstring
+    
+    Single-line docstrings without tabs only need their leading
+    whitespace stripped, so inspect.cleandoc runs just for the rest.
+    
+    Args:
+        node: Function, class or module node
+        
+    Returns:
+        Cleaned docstring, or None if there is none
+    """
+    body = node.body
+    if not body or body[0].__class__ is not _Expr:
+        return None
+    value = body[0].value
+    if value.__class__ is not _Constant or value.value.__class__ is not str:
+        return None
+    text = value.value
+    if '\n' not in text and '\t' not in text:
+        return text.lstrip()
+    return inspect.cleandoc(text)
+
+# Files parse_file will hand to ast.parse; anything else (and content
+# with NUL bytes, i.e. binary data) gets an empty result without the
+# cost of building and raising a SyntaxError
+PYTHON_SUFFIXES = frozenset({'.py', '.pyi', '.pyw'})
+BINARY_SNIFF_BYTES = 2048
+
+# Bump whenever the shape of parse_file results changes so stale
+# on-disk cache entries are ignored (3: entries stored as JSON)
+PARSER_VERSION = 3
+
 class ASTParser:
     """Parse Python code using AST"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize parser
+        
+        Args:
+            cache_dir: Directory for the on-disk parse cache (disabled if
+                None; '~' is expanded)
+        """
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
         self.functions = []
         self.classes = []
         self.imports = []
         self.global_vars = []
         
-    def parse_file(self, filepath: str, content: str) -> Dict:
+    def parse_file(self, filepath: str, content: Union[str, bytes],
+                   keep_tree: bool = False) -> Dict:
         """
         Parse a Python file and extract structure
         
         Args:
             filepath: Path to the file
-            content: File content
+            content: File content, as text or as raw bytes (decoded by
+                ast.parse using the file's encoding declaration)
+            keep_tree: Also return the parsed ast.Module under '_ast' so
+                other analyzers can reuse it (callers must pop it before
+                serializing)
             
         Returns:
             Dictionary containing parsed information
         """
+        if not self._looks_like_python(filepath, content):
+            logger.debug(f"Skipping non-Python file: {filepath}")
+            return self._empty_result(filepath)
+        
+        cache_path = self._cache_path(content) if self.cache_dir else None
+        if cache_path is not None:
+            cached = self._load_cached(cache_path)
+            if cached is not None:
+                cached['filepath'] = filepath
+                return cached
+        
         try:
             tree = ast.parse(content, filename=filepath)
             
@@ -39,7 +141,7 @@ class ASTParser:
             # Analyze AST
             self._analyze_node(tree, filepath)
             
-            return {
+            result = {
                 'filepath': filepath,
                 'functions': self.functions,
                 'classes': self.classes,
@@ -48,6 +150,11 @@ class ASTParser:
                 'total_functions': len(self.functions),
                 'total_classes': len(self.classes)
             }
+            if cache_path is not None:
+                self._store_cached(cache_path, result)
+            if keep_tree:
+                result['_ast'] = tree
+            return result
             
         except SyntaxError as e:
             logger.warning(f"Syntax error in {filepath}: {e}")
@@ -56,56 +163,237 @@ class ASTParser:
             logger.error(f"Error parsing {filepath}: {e}")
             return self._empty_result(filepath)
     
-    def _analyze_node(self, node: ast.AST, filepath: str, parent_class: str = None):
-        """Recursively analyze AST nodes"""
+    def parse_path(self, filepath: str, keep_tree: bool = False) -> Dict:
+        """
+        Parse a Python file straight from disk
         
-        for child in ast.walk(node):
-            # Extract functions
-            if isinstance(child, ast.FunctionDef):
-                func_info = self._extract_function(child, filepath, parent_class)
-                self.functions.append(func_info)
+        The raw bytes go to ast.parse and to the cache key hash, so the
+        file is never decoded to str here.
+        
+        Args:
+            filepath: Path to the file
+            keep_tree: Also return the parsed ast.Module under '_ast'
             
-            # Extract classes
-            elif isinstance(child, ast.ClassDef):
-                class_info = self._extract_class(child, filepath)
-                self.classes.append(class_info)
-                
-                # Analyze methods within class
-                for item in child.body:
-                    if isinstance(item, ast.FunctionDef):
-                        method_info = self._extract_function(item, filepath, child.name)
-                        self.functions.append(method_info)
+        Returns:
+            Dictionary containing parsed information
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"Error reading {filepath}: {e}")
+            return self._empty_result(filepath)
+        return self.parse_file(filepath, content, keep_tree)
+    
+    def _looks_like_python(self, filepath: str, content: Union[str, bytes]) -> bool:
+        """
+        Cheap pre-check before parsing
+        
+        Args:
+            filepath: Path to the file
+            content: File content
             
-            # Extract imports
-            elif isinstance(child, (ast.Import, ast.ImportFrom)):
-                import_info = self._extract_import(child)
-                self.imports.append(import_info)
+        Returns:
+            True if the file has a Python suffix and no NUL bytes near the start
+        """
+        if os.path.splitext(filepath)[1].lower() not in PYTHON_SUFFIXES:
+            return False
+        nul = b'\0' if isinstance(content, bytes) else '\0'
+        return nul not in content[:BINARY_SNIFF_BYTES]
+    
+    def _cache_path(self, content: Union[str, bytes]) -> Path:
+        """
+        Get the cache file for a source text or its raw bytes
+        
+        Args:
+            content: File content
             
-            # Extract global variables
-            elif isinstance(child, ast.Assign) and isinstance(node, ast.Module):
-                var_info = self._extract_variable(child)
-                if var_info:
-                    self.global_vars.append(var_info)
+        Returns:
+            Path of the cache entry (may not exist yet)
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8', 'surrogatepass')
+        digest = hashlib.sha256(content)
+        digest.update(f"|{sys.version_info[0]}.{sys.version_info[1]}|{PARSER_VERSION}".encode())
+        key = digest.hexdigest()
+        return self.cache_dir / key[:2] / key
+    
+    def _load_cached(self, cache_path: Path) -> Optional[Dict]:
+        """
+        Load a cached parse result, or None on a miss
+        
+        Entries are plain JSON, so a planted cache file can at worst
+        yield a wrong result, never run code. A hit refreshes the entry's
+        modification time, which prune_cache evicts by.
+        """
+        try:
+            with open(cache_path, 'rb') as f:
+                result = json.loads(f.read())
+            os.utime(cache_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable AST cache entry {cache_path}: {e}")
+            return None
+        return result if isinstance(result, dict) else None
+    
+    def _store_cached(self, cache_path: Path, result: Dict):
+        """Atomically write a parse result to the cache"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps(result, separators=(',', ':')).encode())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write AST cache entry {cache_path}: {e}")
+    
+    def prune_cache(self, max_bytes: int):
+        """
+        Delete least recently used cache entries until the cache fits
+        
+        Args:
+            max_bytes: Largest total size of the cache entries to keep
+        """
+        if self.cache_dir is None:
+            return
+        
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        
+        if total <= max_bytes:
+            return
+        
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            if total <= max_bytes:
+                break
+        logger.debug(f"Pruned {removed} AST cache entries from {self.cache_dir}")
+    
+    def _analyze_node(self, node: ast.AST, filepath: str, parent_class: str = None):
+        """
+        Analyze the whole tree in a single breadth-first pass
+        
+        Nodes are visited in the same order as ast.walk. Each queued node
+        carries the calls of its enclosing functions, so calls are
+        collected during the same descent instead of re-walking every
+        function body. Handlers are looked up by exact node type; nodes
+        without one cost a single dict miss.
+        """
+        self._filepath = filepath
+        self._parent_class = parent_class
+        self._in_module = isinstance(node, ast.Module)
+        # Methods are recorded twice (as a plain function and as a class
+        # member); both entries share the calls of the same node
+        self._calls_by_node = {}
+        handlers = _NODE_HANDLERS
+        node_type = _AST
+        level = [(node, ())]
+        
+        while level:
+            next_level = []
+            push = next_level.append
+            for child, enclosing_calls in level:
+                handler = handlers.get(child.__class__)
+                if handler is not None:
+                    enclosing_calls = handler(self, child, enclosing_calls)
+                
+                # Inlined ast.iter_child_nodes, without a generator per node
+                for field in child._fields:
+                    value = getattr(child, field, None)
+                    if value.__class__ is list:
+                        for grandchild in value:
+                            if isinstance(grandchild, node_type):
+                                push((grandchild, enclosing_calls))
+                    elif isinstance(value, node_type):
+                        push((value, enclosing_calls))
+            level = next_level
+        
+        self._calls_by_node = None
+        for func_info in self.functions:
+            func_info['calls'] = list(func_info['calls'])
+    
+    def _on_function(self, node: ast.FunctionDef, enclosing_calls: tuple) -> tuple:
+        """Extract a function; its body's calls go to its own call list too"""
+        calls = self._calls_by_node.setdefault(node, {})
+        self.functions.append(
+            self._extract_function(node, self._filepath, self._parent_class, calls)
+        )
+        return enclosing_calls + (calls,)
+    
+    def _on_class(self, node: ast.ClassDef, enclosing_calls: tuple) -> tuple:
+        """Extract a class and its methods"""
+        self.classes.append(self._extract_class(node, self._filepath))
+        
+        # Analyze methods within class
+        for item in node.body:
+            if isinstance(item, _FunctionDef):
+                method_info = self._extract_function(
+                    item, self._filepath, node.name, self._calls_by_node.setdefault(item, {})
+                )
+                self.functions.append(method_info)
+        return enclosing_calls
+    
+    def _on_import(self, node: ast.AST, enclosing_calls: tuple) -> tuple:
+        """Extract an import statement"""
+        self.imports.append(self._extract_import(node))
+        return enclosing_calls
+    
+    def _on_assign(self, node: ast.Assign, enclosing_calls: tuple) -> tuple:
+        """Extract a global variable"""
+        if self._in_module:
+            var_info = self._extract_variable(node)
+            if var_info:
+                self.global_vars.append(var_info)
+        return enclosing_calls
+    
+    def _on_call(self, node: ast.Call, enclosing_calls: tuple) -> tuple:
+        """Record a call for every enclosing function"""
+        if enclosing_calls:
+            call_name = self._call_name(node)
+            if call_name:
+                for calls in enclosing_calls:
+                    calls[call_name] = None
+        return enclosing_calls
     
     def _extract_function(self, node: ast.FunctionDef, filepath: str, 
-                         parent_class: Optional[str] = None) -> Dict:
-        """Extract function/method information"""
+                         parent_class: Optional[str] = None,
+                         calls: Optional[Dict[str, None]] = None) -> Dict:
+        """
+        Extract function/method information
+        
+        calls is an insertion-ordered set of called names, filled in by
+        the traversal and turned into a list once it completes.
+        """
         
         # Get parameters
         args = [arg.arg for arg in node.args.args]
         
         # Get return annotation
-        returns = ast.unparse(node.returns) if node.returns else None
+        returns = _source_text(node.returns) if node.returns else None
         
         # Get docstring
-        docstring = ast.get_docstring(node)
+        docstring = _docstring(node)
         
         # Calculate metrics
         num_lines = node.end_lineno - node.lineno + 1 if node.end_lineno else 0
         
-        # Extract function calls
-        calls = self._extract_calls(node)
-        
         return {
             'name': node.name,
             'type': 'method' if parent_class else 'function',
@@ -116,22 +404,22 @@ class ASTParser:
             'line_start': node.lineno,
             'line_end': node.end_lineno,
             'num_lines': num_lines,
-            'calls': calls,
-            'decorators': [ast.unparse(d) for d in node.decorator_list],
-            'is_async': isinstance(node, ast.AsyncFunctionDef)
+            'calls': calls if calls is not None else {},
+            'decorators': [_source_text(d) for d in node.decorator_list],
+            'is_async': isinstance(node, _AsyncFunctionDef)
         }
     
     def _extract_class(self, node: ast.ClassDef, filepath: str) -> Dict:
         """Extract class information"""
         
         # Get base classes
-        bases = [ast.unparse(base) for base in node.bases]
+        bases = [_source_text(base) for base in node.bases]
         
         # Get docstring
-        docstring = ast.get_docstring(node)
+        docstring = _docstring(node)
         
-        # Count methods
-        methods = [item for item in node.body if isinstance(item, ast.FunctionDef)]
+        # Method names, collected in one pass over the body
+        method_names = [item.name for item in node.body if isinstance(item, _FunctionDef)]
         
         # Calculate metrics
         num_lines = node.end_lineno - node.lineno + 1 if node.end_lineno else 0
@@ -143,9 +431,9 @@ class ASTParser:
             'line_start': node.lineno,
             'line_end': node.end_lineno,
             'num_lines': num_lines,
-            'num_methods': len(methods),
-            'method_names': [m.name for m in methods],
-            'decorators': [ast.unparse(d) for d in node.decorator_list]
+            'num_methods': len(method_names),
+            'method_names': method_names,
+            'decorators': [_source_text(d) for d in node.decorator_list]
         }
     
     def _extract_import(self, node) -> Dict:
@@ -175,16 +463,14 @@ class ASTParser:
                 }
         return None
     
-    def _extract_calls(self, node: ast.FunctionDef) -> List[str]:
-        """Extract function calls within a function"""
-        calls = []
-        for child in ast.walk(node):
-            if isinstance(child, ast.Call):
-                if isinstance(child.func, ast.Name):
-                    calls.append(child.func.id)
-                elif isinstance(child.func, ast.Attribute):
-                    calls.append(ast.unparse(child.func))
-        return list(set(calls))  # Remove duplicates
+    def _call_name(self, node: ast.Call) -> Optional[str]:
+        """Get the called name of a call expression"""
+        func = node.func
+        if isinstance(func, _Name):
+            return func.id
+        elif isinstance(func, _Attribute):
+            return _source_text(func)
+        return None
     
     def _empty_result(self, filepath: str) -> Dict:
         """Return empty result for failed parsing"""
@@ -198,6 +484,17 @@ class ASTParser:
             'total_classes': 0
         }
 
+# Traversal handlers by exact node type (AsyncFunctionDef is not
+# collected, as before)
+_NODE_HANDLERS = {
+    ast.FunctionDef: ASTParser._on_function,
+    ast.ClassDef: ASTParser._on_class,
+    ast.Import: ASTParser._on_import,
+    ast.ImportFrom: ASTParser._on_import,
+    ast.Assign: ASTParser._on_assign,
+    ast.Call: ASTParser._on_call
+}
+
 # Example usage
 if __name__ == "__main__":
     sample_code = """
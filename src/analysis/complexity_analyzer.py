@@ -3,9 +3,13 @@ Complexity Analyzer Module
 Calculate code complexity metrics using Radon
 """
 
-from typing import Dict, List
-from radon.complexity import cc_visit
-from radon.metrics import mi_visit, h_visit
+import ast
+import copy
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from radon.visitors import ComplexityVisitor
+from radon.metrics import mi_compute, h_visit_ast
 from radon.raw import analyze
 from src.utils.logger import logger
 
@@ -16,66 +20,68 @@ class ComplexityAnalyzer:
         self.config = config
         self.max_complexity = config['quality'].get('max_complexity', 10)
         self.max_function_length = config['quality'].get('max_function_length', 50)
+        
+        # Results by content hash, so identical files skip radon
+        self.cache_size = config.get('analysis', {}).get('complexity_cache_size', 1024)
+        self._results: OrderedDict = OrderedDict()
     
-    def analyze_file(self, filepath: str, content: str) -> Dict:
+    def analyze_file(self, filepath: str, content: str,
+                     tree: Optional[ast.Module] = None) -> Dict:
         """
         Analyze complexity metrics for a file
         
         Args:
             filepath: Path to file
             content: File content
+            tree: Already parsed AST of content (parsed here if omitted)
             
         Returns:
             Dictionary containing complexity metrics
         """
+        key = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            # Callers may modify their result, so each gets its own copy
+            result = copy.deepcopy(cached)
+            result['filepath'] = filepath
+            return result
+        
         try:
-            # Cyclomatic complexity
-            complexity_results = cc_visit(content)
+            # All radon metrics below share a single parse and tokenization
+            if tree is None:
+                tree = ast.parse(content)
+            raw_metrics = analyze(content)
             
-            # Maintainability index
-            mi_score = mi_visit(content, multi=True)
+            # Cyclomatic complexity
+            complexity_visitor = ComplexityVisitor.from_ast(tree)
+            complexity_results = complexity_visitor.blocks
             
-            # Halstead metrics - handle both old and new API
-            halstead = h_visit(content)
-            halstead_data = {}
-            try:
-                # Try new API (returns list of tuples)
-                if isinstance(halstead, list) and len(halstead) > 0:
-                    h_item = halstead[0]
-                    if hasattr(h_item, 'total'):
-                        # Even newer API
-                        h = h_item.total
-                        halstead_data = {
-                            'volume': getattr(h, 'volume', 0) if h else 0,
-                            'difficulty': getattr(h, 'difficulty', 0) if h else 0,
-                            'effort': getattr(h, 'effort', 0) if h else 0
-                        }
-                    else:
-                        halstead_data = {
-                            'volume': getattr(h_item, 'volume', 0),
-                            'difficulty': getattr(h_item, 'difficulty', 0),
-                            'effort': getattr(h_item, 'effort', 0)
-                        }
-                elif hasattr(halstead, 'volume'):
-                    # Old API
-                    halstead_data = {
-                        'volume': halstead.volume,
-                        'difficulty': halstead.difficulty,
-                        'effort': halstead.effort
-                    }
-                else:
-                    halstead_data = {'volume': 0, 'difficulty': 0, 'effort': 0}
-            except (TypeError, AttributeError):
-                halstead_data = {'volume': 0, 'difficulty': 0, 'effort': 0}
+            # Halstead metrics (radon >= 5.1 reports file totals under .total)
+            halstead = h_visit_ast(tree).total
+            halstead_data = {
+                'volume': halstead.volume,
+                'difficulty': halstead.difficulty,
+                'effort': halstead.effort
+            }
             
-            # Raw metrics (LOC, SLOC, etc.)
-            raw_metrics = analyze(content)
+            # Maintainability index (same inputs as radon's mi_visit, multi=True)
+            mi_score = self._compute_mi(halstead.volume,
+                                        complexity_visitor.total_complexity,
+                                        raw_metrics)
             
-            # Process complexity results
+            # Process complexity results; average and max are reduced in
+            # the same loop
             functions_complexity = []
             high_complexity = []
+            complexity_total = 0
+            complexity_max = 0
             
             for result in complexity_results:
+                complexity_total += result.complexity
+                if result.complexity > complexity_max:
+                    complexity_max = result.complexity
+                
                 func_data = {
                     'name': result.name,
                     'complexity': result.complexity,
@@ -88,11 +94,12 @@ class ComplexityAnalyzer:
                 if result.complexity > self.max_complexity:
                     high_complexity.append(func_data)
             
-            return {
+            result = {
                 'filepath': filepath,
                 'cyclomatic_complexity': {
-                    'average': self._calculate_average_complexity(complexity_results),
-                    'max': max([r.complexity for r in complexity_results]) if complexity_results else 0,
+                    'average': (round(complexity_total / len(complexity_results), 2)
+                                if complexity_results else 0.0),
+                    'max': complexity_max,
                     'functions': functions_complexity,
                     'high_complexity_count': len(high_complexity),
                     'high_complexity_functions': high_complexity
@@ -110,17 +117,34 @@ class ComplexityAnalyzer:
                     'blank': raw_metrics.blank
                 }
             }
+            self._cache_result(key, copy.deepcopy(result))
+            return result
             
         except Exception as e:
             logger.error(f"Error analyzing complexity for {filepath}: {e}")
             return self._empty_result(filepath)
     
-    def _calculate_average_complexity(self, results: List) -> float:
-        """Calculate average cyclomatic complexity"""
-        if not results:
-            return 0.0
-        total = sum(r.complexity for r in results)
-        return round(total / len(results), 2)
+    def _cache_result(self, key: bytes, result: Dict):
+        """Store a result, evicting the least recently used entry"""
+        self._results[key] = result
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+    
+    def _compute_mi(self, volume: float, total_complexity: int, raw_metrics) -> float:
+        """
+        Compute the maintainability index from already collected metrics
+        
+        Args:
+            volume: Halstead volume of the whole file
+            total_complexity: Total cyclomatic complexity of the file
+            raw_metrics: radon raw metrics for the file
+            
+        Returns:
+            Maintainability index score
+        """
+        comment_lines = raw_metrics.comments + raw_metrics.multi
+        comments = comment_lines / float(raw_metrics.sloc) * 100 if raw_metrics.sloc else 0
+        return mi_compute(volume, total_complexity, raw_metrics.lloc, comments)
     
     def _get_mi_rank(self, mi_score: float) -> str:
         """
@@ -146,36 +170,41 @@ class ComplexityAnalyzer:
         Returns:
             Aggregated complexity metrics
         """
-        total_complexity = []
-        total_mi = []
+        # Running (sum, count) pairs instead of per-file score lists
+        complexity_sum, complexity_count = 0.0, 0
+        mi_sum, mi_count = 0.0, 0
         high_complexity_files = []
         
         for file_data in parsed_files:
             complexity = file_data.get('complexity', {})
             
             if complexity:
+                cyclomatic = complexity.get('cyclomatic_complexity', {})
+                
                 # Collect complexity scores
-                avg_complexity = complexity.get('cyclomatic_complexity', {}).get('average', 0)
+                avg_complexity = cyclomatic.get('average', 0)
                 if avg_complexity > 0:
-                    total_complexity.append(avg_complexity)
+                    complexity_sum += avg_complexity
+                    complexity_count += 1
                 
                 # Collect MI scores
                 mi_score = complexity.get('maintainability_index', {}).get('score', 0)
                 if mi_score > 0:
-                    total_mi.append(mi_score)
+                    mi_sum += mi_score
+                    mi_count += 1
                 
                 # Flag high complexity files
-                high_count = complexity.get('cyclomatic_complexity', {}).get('high_complexity_count', 0)
+                high_count = cyclomatic.get('high_complexity_count', 0)
                 if high_count > 0:
                     high_complexity_files.append({
                         'file': file_data.get('filepath'),
                         'count': high_count,
-                        'functions': complexity.get('cyclomatic_complexity', {}).get('high_complexity_functions', [])
+                        'functions': cyclomatic.get('high_complexity_functions', [])
                     })
         
         return {
-            'average_complexity': round(sum(total_complexity) / len(total_complexity), 2) if total_complexity else 0,
-            'average_maintainability': round(sum(total_mi) / len(total_mi), 2) if total_mi else 0,
+            'average_complexity': round(complexity_sum / complexity_count, 2) if complexity_count else 0,
+            'average_maintainability': round(mi_sum / mi_count, 2) if mi_count else 0,
             'total_high_complexity_files': len(high_complexity_files),
             'high_complexity_files': high_complexity_files
         }
@@ -195,4 +224,4 @@ class ComplexityAnalyzer:
             },
             'halstead': {},
             'raw_metrics': {}
-        }
\ No newline at end of file
+        }
@@ -3,10 +3,89 @@ Metrics Calculator Module
 Calculate various code metrics (LOC, complexity, etc.)
 """
 
-from typing import Dict, List
-from pathlib import Path
+import os
+import re
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Tuple
 from src.utils.logger import logger
 
+# File extension to language name
+_LANGUAGE_MAP = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.jsx': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.rb': 'Ruby',
+    '.php': 'PHP'
+}
+
+# Triple-quote tokens, and a line that opens with one (optionally prefixed)
+_TRIPLE_QUOTE_RE = re.compile(r'"""|\'\'\'')
+_STRING_LINE_RE = re.compile(r'[rRbBuUfF]{0,2}(?:"""|\'\'\')')
+
+# Line count of a parsed function or class record
+_num_lines = itemgetter('num_lines')
+
+# Results for files and repositories with nothing to measure; only ever
+# handed out through _fresh_copy, since callers may update the result
+_EMPTY_FILE_METRICS = {
+    'filepath': None,
+    'lines_of_code': {
+        'total': 0,
+        'source': 0,
+        'comments': 0,
+        'blank': 0,
+        'comment_ratio': 0,
+        'code_ratio': 0
+    },
+    'structure': {
+        'functions': 0,
+        'classes': 0,
+        'imports': 0,
+        'avg_function_length': 0,
+        'avg_class_length': 0
+    },
+    'documentation': {
+        'coverage': 0,
+        'functions_with_docs': 0,
+        'classes_with_docs': 0
+    }
+}
+
+_EMPTY_REPO_METRICS = {
+    'total_files': 0,
+    'lines_of_code': {
+        'total': 0,
+        'source': 0,
+        'comments': 0,
+        'blank': 0,
+        'comment_ratio': 0
+    },
+    'structure': {
+        'total_functions': 0,
+        'total_classes': 0,
+        'total_imports': 0,
+        'avg_functions_per_file': 0,
+        'avg_classes_per_file': 0
+    },
+    'documentation': {
+        'average_coverage': 0
+    },
+    'per_language': {}
+}
+
+def _fresh_copy(template: Dict) -> Dict:
+    """Copy a metrics template down to its (flat) sections"""
+    return {key: value.copy() if type(value) is dict else value
+            for key, value in template.items()}
+
 class MetricsCalculator:
     """Calculate code metrics"""
     
@@ -32,34 +111,24 @@ class MetricsCalculator:
             lines = content.split('\n')
             loc = len(lines)
             
-            # Remove empty and comment lines for SLOC
-            sloc = self._count_sloc(lines)
-            
-            # Comment lines
-            comments = self._count_comments(lines)
-            
-            # Blank lines
-            blank = loc - sloc - comments
+            # Source, comment and blank lines in a single pass
+            sloc, comments, blank = self._scan_lines(lines)
             
-            # Function and class counts
-            total_functions = len(parsed_data.get('functions', []))
-            total_classes = len(parsed_data.get('classes', []))
+            # Function and class counts, lengths and docstrings
+            (total_functions, function_lines, functions_with_docs,
+             total_classes, class_lines, classes_with_docs) = self._aggregate_parsed(parsed_data)
             
-            # Average function length
-            avg_function_length = self._calculate_avg_function_length(
-                parsed_data.get('functions', [])
-            )
-            
-            # Average class length
-            avg_class_length = self._calculate_avg_class_length(
-                parsed_data.get('classes', [])
-            )
+            # Average function and class length
+            avg_function_length = round(function_lines / total_functions, 2) if total_functions else 0.0
+            avg_class_length = round(class_lines / total_classes, 2) if total_classes else 0.0
             
             # Import count
             total_imports = len(parsed_data.get('imports', []))
             
             # Documentation coverage
-            doc_coverage = self._calculate_doc_coverage(parsed_data)
+            total_items = total_functions + total_classes
+            documented_items = functions_with_docs + classes_with_docs
+            doc_coverage = round((documented_items / total_items) * 100, 2) if total_items else 0.0
             
             return {
                 'filepath': filepath,
@@ -80,8 +149,8 @@ class MetricsCalculator:
                 },
                 'documentation': {
                     'coverage': doc_coverage,
-                    'functions_with_docs': self._count_documented_functions(parsed_data),
-                    'classes_with_docs': self._count_documented_classes(parsed_data)
+                    'functions_with_docs': functions_with_docs,
+                    'classes_with_docs': classes_with_docs
                 }
             }
             
@@ -89,290 +158,104 @@ class MetricsCalculator:
             logger.error(f"Error calculating metrics for {filepath}: {e}")
             return self._empty_metrics(filepath)
     
-    def _count_sloc(self, lines: List[str]) -> int:
+    def _scan_lines(self, lines: List[str]) -> Tuple[int, int, int]:
         """
-        Count Source Lines of Code (non-empty, non-comment lines)
+        Classify every line as source, comment or blank in one pass
         
-        Args:
-            lines: List of code lines
-            
-        Returns:
-            SLOC count
-        """
-        sloc = 0
-        in_multiline_string = False
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            # Check for multiline strings
-            if '"""' in stripped or "'''" in stripped:
-                in_multiline_string = not in_multiline_string
-                continue
-            
-            # Skip if in multiline string
-            if in_multiline_string:
-                continue
-            
-            # Skip empty lines and comments
-            if stripped and not stripped.startswith('#'):
-                sloc += 1
-        
-        return sloc
-    
-    def _count_comments(self, lines: List[str]) -> int:
-        """
-        Count comment lines
+        Lines of bare multiline strings (docstrings) count as comments;
+        a string opened after code on the same line makes that line source.
         
         Args:
             lines: List of code lines
             
         Returns:
-            Comment line count
+            (sloc, comments, blank) counts
         """
+        sloc = 0
         comments = 0
         in_docstring = False
         
         for line in lines:
             stripped = line.strip()
-            
-            # Multiline strings (docstrings)
+            quotes = 0
             if '"""' in stripped or "'''" in stripped:
-                in_docstring = not in_docstring
-                comments += 1
-                continue
+                quotes = len(_TRIPLE_QUOTE_RE.findall(stripped))
             
             if in_docstring:
+                # Inside a multiline string; an odd number of quotes closes it
                 comments += 1
-                continue
-            
-            # Single line comments
-            if stripped.startswith('#'):
-                comments += 1
+                if quotes & 1:
+                    in_docstring = False
+            elif quotes:
+                # An odd number of quotes opens a multiline string; an even
+                # number opens and closes on this line (e.g. a one-line
+                # docstring). Bare strings count as comments.
+                if quotes & 1:
+                    in_docstring = True
+                if _STRING_LINE_RE.match(stripped):
+                    comments += 1
+                else:
+                    sloc += 1
+            elif stripped:
+                # Single line comments vs source lines
+                if stripped[0] == '#':
+                    comments += 1
+                else:
+                    sloc += 1
         
-        return comments
+        return sloc, comments, len(lines) - sloc - comments
     
-    def _calculate_avg_function_length(self, functions: List[Dict]) -> float:
+    def _aggregate_parsed(self, parsed_data: Dict) -> Tuple[int, int, int, int, int, int]:
         """
-        Calculate average function length
-        
-        Args:
-            functions: List of function data
-            
-        Returns:
-            Average length in lines
-        """
-        if not functions:
-            return 0.0
-        
-        total_lines = sum(f.get('num_lines', 0) for f in functions)
-        return round(total_lines / len(functions), 2)
-    
-    def _calculate_avg_class_length(self, classes: List[Dict]) -> float:
-        """
-        Calculate average class length
-        
-        Args:
-            classes: List of class data
-            
-        Returns:
-            Average length in lines
-        """
-        if not classes:
-            return 0.0
-        
-        total_lines = sum(c.get('num_lines', 0) for c in classes)
-        return round(total_lines / len(classes), 2)
-    
-    def _calculate_doc_coverage(self, parsed_data: Dict) -> float:
-        """
-        Calculate documentation coverage percentage
+        Count functions and classes with their total lines and docstrings
         
         Args:
             parsed_data: Parsed AST data
             
         Returns:
-            Coverage percentage (0-100)
+            (functions, function lines, documented functions,
+             classes, class lines, documented classes)
         """
-        total_items = 0
-        documented_items = 0
+        # Records from ASTParser always carry these keys
+        functions = parsed_data.get('functions', [])
+        function_lines = sum(map(_num_lines, functions))
+        functions_with_docs = sum(1 for func in functions if func['docstring'])
         
-        # Count functions
-        for func in parsed_data.get('functions', []):
-            total_items += 1
-            if func.get('docstring'):
-                documented_items += 1
+        classes = parsed_data.get('classes', [])
+        class_lines = sum(map(_num_lines, classes))
+        classes_with_docs = sum(1 for cls in classes if cls['docstring'])
         
-        # Count classes
-        for cls in parsed_data.get('classes', []):
-            total_items += 1
-            if cls.get('docstring'):
-                documented_items += 1
-        
-        if total_items == 0:
-            return 0.0
-        
-        return round((documented_items / total_items) * 100, 2)
-    
-    def _count_documented_functions(self, parsed_data: Dict) -> int:
-        """Count functions with docstrings"""
-        return sum(1 for f in parsed_data.get('functions', []) 
-                  if f.get('docstring'))
-    
-    def _count_documented_classes(self, parsed_data: Dict) -> int:
-        """Count classes with docstrings"""
-        return sum(1 for c in parsed_data.get('classes', []) 
-                  if c.get('docstring'))
+        return (len(functions), function_lines, functions_with_docs,
+                len(classes), class_lines, classes_with_docs)
     
-    def calculate_repository_metrics(self, all_files_metrics: List[Dict]) -> Dict:
+    def calculate_repository_metrics(self, all_files_metrics: Iterable[Dict]) -> Dict:
         """
         Calculate aggregated metrics for entire repository
         
         Args:
-            all_files_metrics: List of per-file metrics
+            all_files_metrics: Per-file metrics (any iterable; consumed once)
             
         Returns:
             Aggregated metrics
         """
-        if not all_files_metrics:
-            return self._empty_repo_metrics()
-        
-        total_loc = sum(m['lines_of_code']['total'] for m in all_files_metrics)
-        total_sloc = sum(m['lines_of_code']['source'] for m in all_files_metrics)
-        total_comments = sum(m['lines_of_code']['comments'] for m in all_files_metrics)
-        total_blank = sum(m['lines_of_code']['blank'] for m in all_files_metrics)
-        
-        total_functions = sum(m['structure']['functions'] for m in all_files_metrics)
-        total_classes = sum(m['structure']['classes'] for m in all_files_metrics)
-        total_imports = sum(m['structure']['imports'] for m in all_files_metrics)
-        
-        # Average documentation coverage
-        avg_doc_coverage = sum(m['documentation']['coverage'] 
-                              for m in all_files_metrics) / len(all_files_metrics)
-        
-        return {
-            'total_files': len(all_files_metrics),
-            'lines_of_code': {
-                'total': total_loc,
-                'source': total_sloc,
-                'comments': total_comments,
-                'blank': total_blank,
-                'comment_ratio': round(total_comments / total_loc * 100, 2) if total_loc > 0 else 0
-            },
-            'structure': {
-                'total_functions': total_functions,
-                'total_classes': total_classes,
-                'total_imports': total_imports,
-                'avg_functions_per_file': round(total_functions / len(all_files_metrics), 2),
-                'avg_classes_per_file': round(total_classes / len(all_files_metrics), 2)
-            },
-            'documentation': {
-                'average_coverage': round(avg_doc_coverage, 2)
-            },
-            'per_language': self._calculate_language_metrics(all_files_metrics)
-        }
-    
-    def _calculate_language_metrics(self, all_files_metrics: List[Dict]) -> Dict:
-        """
-        Calculate metrics broken down by language
-        
-        Args:
-            all_files_metrics: List of per-file metrics
-            
-        Returns:
-            Metrics by language
-        """
-        language_metrics = {}
-        
+        accumulator = RepoMetricsAccumulator()
         for metrics in all_files_metrics:
-            filepath = metrics['filepath']
-            ext = Path(filepath).suffix
-            
-            # Determine language
-            language = self._get_language_from_extension(ext)
-            
-            if language not in language_metrics:
-                language_metrics[language] = {
-                    'files': 0,
-                    'lines': 0,
-                    'functions': 0,
-                    'classes': 0
-                }
-            
-            language_metrics[language]['files'] += 1
-            language_metrics[language]['lines'] += metrics['lines_of_code']['total']
-            language_metrics[language]['functions'] += metrics['structure']['functions']
-            language_metrics[language]['classes'] += metrics['structure']['classes']
-        
-        return language_metrics
+            accumulator.add(metrics)
+        return accumulator.finalize()
     
     def _get_language_from_extension(self, ext: str) -> str:
         """Map file extension to language name"""
-        language_map = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.jsx': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.tsx': 'TypeScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.go': 'Go',
-            '.rs': 'Rust',
-            '.rb': 'Ruby',
-            '.php': 'PHP'
-        }
-        return language_map.get(ext, 'Unknown')
+        return _LANGUAGE_MAP.get(ext, 'Unknown')
     
     def _empty_metrics(self, filepath: str) -> Dict:
         """Return empty metrics for failed calculation"""
-        return {
-            'filepath': filepath,
-            'lines_of_code': {
-                'total': 0,
-                'source': 0,
-                'comments': 0,
-                'blank': 0,
-                'comment_ratio': 0,
-                'code_ratio': 0
-            },
-            'structure': {
-                'functions': 0,
-                'classes': 0,
-                'imports': 0,
-                'avg_function_length': 0,
-                'avg_class_length': 0
-            },
-            'documentation': {
-                'coverage': 0,
-                'functions_with_docs': 0,
-                'classes_with_docs': 0
-            }
-        }
+        metrics = _fresh_copy(_EMPTY_FILE_METRICS)
+        metrics['filepath'] = filepath
+        return metrics
     
     def _empty_repo_metrics(self) -> Dict:
         """Return empty repository metrics"""
-        return {
-            'total_files': 0,
-            'lines_of_code': {
-                'total': 0,
-                'source': 0,
-                'comments': 0,
-                'blank': 0,
-                'comment_ratio': 0
-            },
-            'structure': {
-                'total_functions': 0,
-                'total_classes': 0,
-                'total_imports': 0,
-                'avg_functions_per_file': 0,
-                'avg_classes_per_file': 0
-            },
-            'documentation': {
-                'average_coverage': 0
-            },
-            'per_language': {}
-        }
+        return _fresh_copy(_EMPTY_REPO_METRICS)
     
     def get_metrics_summary(self, metrics: Dict) -> str:
         """
@@ -410,6 +293,101 @@ Documentation:
 """
         return summary
 
+def _language_counts() -> Dict:
+    """Zeroed per-language totals (a module function, so accumulators pickle)"""
+    return {
+        'files': 0,
+        'lines': 0,
+        'functions': 0,
+        'classes': 0
+    }
+
+class RepoMetricsAccumulator:
+    """
+    Aggregate per-file metrics into repository metrics one file at a time
+    
+    Lets callers stream per-file results (e.g. straight from a worker
+    pool) instead of holding every file's metrics until aggregation.
+    """
+    
+    def __init__(self):
+        """Initialize empty totals"""
+        self.total_files = 0
+        self.total_loc = 0
+        self.total_sloc = 0
+        self.total_comments = 0
+        self.total_blank = 0
+        self.total_functions = 0
+        self.total_classes = 0
+        self.total_imports = 0
+        self.doc_coverage_sum = 0.0
+        self.per_language: Dict[str, Dict] = defaultdict(_language_counts)
+    
+    def add(self, metrics: Dict):
+        """
+        Add one file's metrics to the totals
+        
+        Args:
+            metrics: Per-file metrics from calculate_file_metrics
+        """
+        self.total_files += 1
+        
+        loc = metrics['lines_of_code']
+        self.total_loc += loc['total']
+        self.total_sloc += loc['source']
+        self.total_comments += loc['comments']
+        self.total_blank += loc['blank']
+        
+        structure = metrics['structure']
+        self.total_functions += structure['functions']
+        self.total_classes += structure['classes']
+        self.total_imports += structure['imports']
+        
+        self.doc_coverage_sum += metrics['documentation']['coverage']
+        
+        # Breakdown by language
+        language = _LANGUAGE_MAP.get(os.path.splitext(metrics['filepath'])[1], 'Unknown')
+        
+        counts = self.per_language[language]
+        counts['files'] += 1
+        counts['lines'] += loc['total']
+        counts['functions'] += structure['functions']
+        counts['classes'] += structure['classes']
+    
+    def finalize(self) -> Dict:
+        """
+        Build the repository metrics from the totals so far
+        
+        Returns:
+            Aggregated metrics (as calculate_repository_metrics)
+        """
+        if not self.total_files:
+            return _fresh_copy(_EMPTY_REPO_METRICS)
+        
+        return {
+            'total_files': self.total_files,
+            'lines_of_code': {
+                'total': self.total_loc,
+                'source': self.total_sloc,
+                'comments': self.total_comments,
+                'blank': self.total_blank,
+                'comment_ratio': (round(self.total_comments / self.total_loc * 100, 2)
+                                  if self.total_loc > 0 else 0)
+            },
+            'structure': {
+                'total_functions': self.total_functions,
+                'total_classes': self.total_classes,
+                'total_imports': self.total_imports,
+                'avg_functions_per_file': round(self.total_functions / self.total_files, 2),
+                'avg_classes_per_file': round(self.total_classes / self.total_files, 2)
+            },
+            'documentation': {
+                'average_coverage': round(self.doc_coverage_sum / self.total_files, 2)
+            },
+            'per_language': {language: dict(counts)
+                             for language, counts in self.per_language.items()}
+        }
+
 # Example usage
 if __name__ == "__main__":
     sample_code = """
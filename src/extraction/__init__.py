@@ -2,8 +2,15 @@
 Extraction module - Dependency and code smell extraction
 """
 
-from src.extraction.dependency_extractor import DependencyExtractor
-from src.extraction.code_smell_detector import CodeSmellDetector
-from src.extraction.call_graph_builder import CallGraphBuilder
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'DependencyExtractor': 'src.extraction.dependency_extractor',
+    'CodeSmellDetector': 'src.extraction.code_smell_detector',
+    'CallGraphBuilder': 'src.extraction.call_graph_builder'
+}
 
 __all__ = ['DependencyExtractor', 'CodeSmellDetector', 'CallGraphBuilder']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
@@ -4,29 +4,55 @@ Builds function call graphs for code analysis
 """
 
 import ast
+import heapq
+import sys
+from operator import itemgetter
 from typing import Dict, List, Set, Tuple
 import networkx as nx
 from collections import defaultdict
 from src.utils.logger import logger
 
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+# Graphs with at least this many functions find strongly connected
+# components with scipy's sparse kernels (when installed)
+SPARSE_SCC_MIN_FUNCTIONS = 10000
+
+# Longest call cycle (in functions) reported as mutual recursion
+MAX_RECURSION_CYCLE = 5
+
+# Most call chains returned by get_call_chain
+MAX_CALL_CHAINS = 10
+
 class CallGraphBuilder:
     """Build function call graphs"""
     
     def __init__(self):
         """Initialize call graph builder"""
         self.call_graph = nx.DiGraph()
-        self.function_calls = defaultdict(set)
-        self.function_definitions = {}
+        # Function IDs by bare function name, in definition order
+        self._ids_by_name = defaultdict(list)
+        # Result of _analyze_call_graph, kept by analysis()
+        self._analysis = None
     
-    def build_call_graph(self, parsed_files: List[Dict]) -> Dict:
+    def build_call_graph(self, parsed_files: List[Dict], analyze: bool = True) -> Dict:
         """
         Build call graph from parsed files
         
         Args:
             parsed_files: List of parsed file data
+            analyze: Include the graph analysis; callers that only want
+                the graph pass False and can call analysis() later
             
         Returns:
-            Dictionary containing call graph information
+            Dictionary with 'call_graph', 'function_calls',
+            'function_definitions' and (if analyze) 'analysis'
         """
         logger.info("Building function call graph...")
         
@@ -37,16 +63,37 @@ class CallGraphBuilder:
         # Second pass: build call relationships
         for file_data in parsed_files:
             self._build_calls(file_data)
+        self._analysis = None
         
-        # Analyze the graph
-        analysis = self._analyze_call_graph()
-        
-        return {
+        result = {
             'call_graph': self.call_graph,
-            'function_calls': dict(self.function_calls),
-            'function_definitions': self.function_definitions,
-            'analysis': analysis
+            'function_calls': self.function_calls,
+            'function_definitions': self.function_definitions
         }
+        if analyze:
+            result['analysis'] = self.analysis()
+        return result
+    
+    def analysis(self) -> Dict:
+        """
+        Get the call graph analysis, computed on the first call after a build
+        
+        Returns:
+            Analysis results (see _analyze_call_graph)
+        """
+        if self._analysis is None:
+            self._analysis = self._analyze_call_graph()
+        return self._analysis
+    
+    @property
+    def function_calls(self) -> Dict[str, Set[str]]:
+        """Callees by caller ID, for functions that call something (from the graph's edges)"""
+        return {caller: set(callees) for caller, callees in self.call_graph.adjacency() if callees}
+    
+    @property
+    def function_definitions(self) -> Dict[str, Dict]:
+        """Function metadata by ID (a view of the graph's node attributes)"""
+        return dict(self.call_graph.nodes(data=True))
     
     def _collect_functions(self, file_data: Dict):
         """
@@ -59,23 +106,20 @@ class CallGraphBuilder:
         
         for func in file_data.get('functions', []):
             func_name = func['name']
+            func_id = self._function_id(filepath, func)
             
-            # Create unique identifier
-            if func.get('parent_class'):
-                func_id = f"{filepath}::{func['parent_class']}.{func_name}"
-            else:
-                func_id = f"{filepath}::{func_name}"
-            
-            self.function_definitions[func_id] = {
-                'name': func_name,
-                'file': filepath,
-                'class': func.get('parent_class'),
-                'line': func.get('line_start'),
-                'complexity': func.get('complexity', 0)
-            }
+            if func_id not in self.call_graph:
+                self._ids_by_name[func_name].append(func_id)
             
-            # Add node to graph
-            self.call_graph.add_node(func_id, **self.function_definitions[func_id])
+            # The node attributes are the only copy of the definition
+            self.call_graph.add_node(
+                func_id,
+                name=func_name,
+                file=filepath,
+                **{'class': func.get('parent_class')},
+                line=func.get('line_start'),
+                complexity=func.get('complexity', 0)
+            )
     
     def _build_calls(self, file_data: Dict):
         """
@@ -85,36 +129,61 @@ class CallGraphBuilder:
             file_data: Parsed file data
         """
         filepath = file_data.get('filepath', 'unknown')
+        functions = file_data.get('functions', [])
         
-        for func in file_data.get('functions', []):
+        # ID prefixes for this file and the classes defined in it, built
+        # once instead of per call
+        file_prefix = f"{filepath}::"
+        class_prefixes = [
+            f"{file_prefix}{class_name}."
+            for class_name in dict.fromkeys(
+                func['parent_class'] for func in functions if func.get('parent_class')
+            )
+        ]
+        
+        # The graph's nodes are fixed by now, so a call name resolves the
+        # same way for every function in the file
+        resolved = {}
+        
+        for func in functions:
             # Get caller ID
-            if func.get('parent_class'):
-                caller_id = f"{filepath}::{func['parent_class']}.{func['name']}"
-            else:
-                caller_id = f"{filepath}::{func['name']}"
+            caller_id = self._function_id(filepath, func)
             
             # Get all calls made by this function
             calls = func.get('calls', [])
+            edges = []
             
             for call in calls:
                 # Try to resolve the call
-                callee_ids = self._resolve_call(call, filepath, file_data)
+                callee_ids = resolved.get(call)
+                if callee_ids is None:
+                    callee_ids = resolved[call] = self._resolve_call(
+                        call, file_prefix, class_prefixes
+                    )
                 
-                for callee_id in callee_ids:
-                    # Add edge
-                    if self.call_graph.has_node(callee_id):
-                        self.call_graph.add_edge(caller_id, callee_id)
-                        self.function_calls[caller_id].add(callee_id)
+                edges.extend((caller_id, callee_id) for callee_id in callee_ids)
+            
+            # Every resolved ID is a node already (see _resolve_call)
+            self.call_graph.add_edges_from(edges)
     
-    def _resolve_call(self, call_name: str, current_file: str, 
-                     file_data: Dict) -> List[str]:
+    @staticmethod
+    def _function_id(filepath: str, func: Dict) -> str:
+        """Unique graph ID of a function or method (interned)"""
+        parent_class = func.get('parent_class')
+        if parent_class:
+            return sys.intern(f"{filepath}::{parent_class}.{func['name']}")
+        return sys.intern(f"{filepath}::{func['name']}")
+    
+    def _resolve_call(self, call_name: str, file_prefix: str, 
+                     class_prefixes: List[str]) -> List[str]:
         """
         Resolve a function call to its definition
         
         Args:
             call_name: Name of the called function
-            current_file: Current file path
-            file_data: Current file data
+            file_prefix: ID prefix of the current file ("path::")
+            class_prefixes: ID prefixes of the classes defined in the
+                current file ("path::Class.")
             
         Returns:
             List of possible function IDs
@@ -124,26 +193,23 @@ class CallGraphBuilder:
         # Handle method calls (e.g., "obj.method")
         if '.' in call_name:
             # For now, just try the method name
-            method_name = call_name.split('.')[-1]
+            method_name = call_name.rpartition('.')[2]
             call_name = method_name
         
         # Try local file first
-        local_id = f"{current_file}::{call_name}"
-        if local_id in self.function_definitions:
-            possible_ids.append(local_id)
+        local_id = file_prefix + call_name
+        if local_id in self.call_graph:
+            possible_ids.append(sys.intern(local_id))
         
         # Try with class context
-        for func in file_data.get('functions', []):
-            if func.get('parent_class'):
-                class_id = f"{current_file}::{func['parent_class']}.{call_name}"
-                if class_id in self.function_definitions:
-                    possible_ids.append(class_id)
+        for class_prefix in class_prefixes:
+            class_id = class_prefix + call_name
+            if class_id in self.call_graph:
+                possible_ids.append(sys.intern(class_id))
         
-        # If not found locally, search all files (expensive)
+        # If not found locally, any function or method with that name
         if not possible_ids:
-            for func_id in self.function_definitions:
-                if func_id.endswith(f"::{call_name}") or func_id.endswith(f".{call_name}"):
-                    possible_ids.append(func_id)
+            possible_ids.extend(self._ids_by_name.get(call_name, ()))
         
         return possible_ids
     
@@ -164,13 +230,17 @@ class CallGraphBuilder:
                 'dead_end_functions': []
             }
         
-        # Most called functions (high in-degree)
-        in_degrees = dict(self.call_graph.in_degree())
-        most_called = sorted(in_degrees.items(), key=lambda x: x[1], reverse=True)[:10]
+        # Most called functions (high in-degree); only the top ten are
+        # ordered (nlargest keeps sorted()'s order for ties)
+        most_called = heapq.nlargest(10, self.call_graph.in_degree(), key=itemgetter(1))
         
-        # Functions that call the most (high out-degree)
-        out_degrees = dict(self.call_graph.out_degree())
-        most_calls = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:10]
+        # Functions that call the most (high out-degree). Functions without
+        # outgoing calls are never listed, so they are left out here and
+        # counted as dead ends (leaf nodes) instead
+        callers = [(node, len(callees)) for node, callees in self.call_graph.succ.items()
+                   if callees]
+        most_calls = heapq.nlargest(10, callers, key=itemgetter(1))
+        dead_end_count = len(self.call_graph) - len(callers)
         
         # Detect recursive functions (self-loops)
         recursive = []
@@ -178,19 +248,17 @@ class CallGraphBuilder:
             if self.call_graph.has_edge(node, node):
                 recursive.append(node)
         
-        # Detect mutual recursion (simple cycles)
-        try:
-            cycles = list(nx.simple_cycles(self.call_graph))
-            recursive.extend([c for cycle in cycles for c in cycle if len(cycle) <= 5])
-        except:
-            pass
+        # Detect mutual recursion: every node of a strongly connected
+        # component (Tarjan, linear time) lies on a cycle within it
+        for component in self._cyclic_components():
+            if len(component) <= MAX_RECURSION_CYCLE:
+                # Any cycle here has at most len(component) nodes
+                recursive.extend(component)
+            else:
+                recursive.extend(self._nodes_on_short_cycles(component))
         
         recursive = list(set(recursive))  # Remove duplicates
         
-        # Dead-end functions (no outgoing calls, leaf nodes)
-        dead_ends = [node for node in self.call_graph.nodes() 
-                    if self.call_graph.out_degree(node) == 0]
-        
         return {
             'total_functions': len(self.call_graph.nodes()),
             'total_calls': len(self.call_graph.edges()),
@@ -198,7 +266,7 @@ class CallGraphBuilder:
                 {
                     'function': func_id,
                     'calls': count,
-                    'name': self.function_definitions.get(func_id, {}).get('name', 'unknown')
+                    'name': self.call_graph.nodes[func_id].get('name', 'unknown')
                 }
                 for func_id, count in most_called if count > 0
             ][:5],
@@ -206,24 +274,84 @@ class CallGraphBuilder:
                 {
                     'function': func_id,
                     'calls': count,
-                    'name': self.function_definitions.get(func_id, {}).get('name', 'unknown')
+                    'name': self.call_graph.nodes[func_id].get('name', 'unknown')
                 }
                 for func_id, count in most_calls if count > 0
             ][:5],
             'recursive_functions': [
                 {
                     'function': func_id,
-                    'name': self.function_definitions.get(func_id, {}).get('name', 'unknown')
+                    'name': self.call_graph.nodes[func_id].get('name', 'unknown')
                 }
                 for func_id in recursive[:10]
             ],
-            'dead_end_functions': len(dead_ends),
+            'dead_end_functions': dead_end_count,
             'average_calls_per_function': (
                 len(self.call_graph.edges()) / len(self.call_graph.nodes())
                 if len(self.call_graph.nodes()) > 0 else 0
             )
         }
     
+    def _cyclic_components(self) -> List[Set[str]]:
+        """
+        Find strongly connected components of two or more functions
+        
+        Returns:
+            Node sets of the components
+        """
+        if HAS_SCIPY and len(self.call_graph) >= SPARSE_SCC_MIN_FUNCTIONS:
+            return self._sparse_cyclic_components()
+        return [component for component in nx.strongly_connected_components(self.call_graph)
+                if len(component) > 1]
+    
+    def _sparse_cyclic_components(self) -> List[Set[str]]:
+        """
+        Find strongly connected components of two or more functions
+        on a CSR copy of the call graph (scipy, compiled)
+        
+        Returns:
+            Node sets of the components
+        """
+        nodes = list(self.call_graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        
+        rows = []
+        cols = []
+        for node, callees in self.call_graph.succ.items():
+            if callees:
+                rows.extend([index[node]] * len(callees))
+                cols.extend(map(index.__getitem__, callees))
+        
+        size = len(nodes)
+        adjacency = csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)),
+                               shape=(size, size))
+        _, labels = connected_components(adjacency, directed=True, connection='strong')
+        
+        cyclic = np.flatnonzero(np.bincount(labels)[labels] > 1)
+        components = defaultdict(set)
+        for i, label in zip(cyclic.tolist(), labels[cyclic].tolist()):
+            components[label].add(nodes[i])
+        return list(components.values())
+    
+    def _nodes_on_short_cycles(self, component: Set[str]) -> Set[str]:
+        """
+        Find nodes of a large component that lie on a short cycle
+        
+        Args:
+            component: Strongly connected component of the call graph
+            
+        Returns:
+            Nodes on a cycle of at most MAX_RECURSION_CYCLE functions
+        """
+        subgraph = self.call_graph.subgraph(component)
+        try:
+            cycles = nx.simple_cycles(subgraph, length_bound=MAX_RECURSION_CYCLE)
+        except TypeError:
+            # networkx < 3.1 has no length_bound
+            cycles = (cycle for cycle in nx.simple_cycles(subgraph)
+                      if len(cycle) <= MAX_RECURSION_CYCLE)
+        return {node for cycle in cycles for node in cycle}
+    
     def get_call_chain(self, function_id: str, max_depth: int = 5) -> List[List[str]]:
         """
         Get call chains starting from a function
@@ -238,26 +366,39 @@ class CallGraphBuilder:
         if not self.call_graph.has_node(function_id):
             return []
         
+        successors = self.call_graph.succ
+        if max_depth <= 0 or not successors[function_id]:
+            return [[function_id]]
+        
+        # Depth-first over one shared chain; stack holds the successor
+        # iterators of the nodes on the chain
         chains = []
+        chain = [function_id]
+        in_chain = {function_id}
+        stack = [iter(successors[function_id])]
         
-        def dfs(node: str, chain: List[str], depth: int):
-            if depth >= max_depth:
-                chains.append(chain)
-                return
-            
-            successors = list(self.call_graph.successors(node))
-            
-            if not successors:
-                chains.append(chain)
-                return
+        while stack:
+            for successor in stack[-1]:
+                if successor not in in_chain:  # Avoid cycles
+                    break
+            else:
+                # All successors explored; backtrack
+                stack.pop()
+                in_chain.discard(chain.pop())
+                continue
             
-            for successor in successors:
-                if successor not in chain:  # Avoid cycles
-                    dfs(successor, chain + [successor], depth + 1)
-        
-        dfs(function_id, [function_id], 0)
+            chain.append(successor)
+            if len(chain) > max_depth or not successors[successor]:
+                # Depth limit or dead end: the chain is complete
+                chains.append(chain.copy())
+                if len(chains) >= MAX_CALL_CHAINS:
+                    break
+                chain.pop()
+            else:
+                in_chain.add(successor)
+                stack.append(iter(successors[successor]))
         
-        return chains[:10]  # Limit to 10 chains
+        return chains
     
     def export_dot(self, output_path: str):
         """
@@ -4,11 +4,112 @@ Detect common code smells and quality issues
 """
 
 import re
-from typing import Dict, List, Set
-from collections import defaultdict
-from difflib import SequenceMatcher
+import random
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+from collections import Counter, defaultdict
 from src.utils.logger import logger
 
+# Try to import numpy for vectorized MinHash signatures
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Implicit first parameters that do not count towards parameter limits
+_IMPLICIT_PARAMS = frozenset(('self', 'cls'))
+
+# Functions never reported as dead code
+_ENTRY_POINT_NAMES = frozenset(('main', 'run', 'execute'))
+
+# Regex patterns used by the line-based smell scans
+SMELL_PATTERNS = {
+    # Numeric literals of two or more digits (excluding 0, 1, -1). Same
+    # matches as r'\b(?<![\w.])\d{2,}\b(?![\w.])', but starting with \d lets
+    # re skip ahead to digits instead of trying the lookbehind everywhere
+    'magic_number': r'\d(?<![\w.]\d)\d+(?![\w.])',
+}
+
+# Common acceptable numbers, never reported as magic
+_ACCEPTABLE_NUMBERS = frozenset(('0', '1', '10', '100'))
+
+# Most magic numbers reported per file
+MAX_MAGIC_NUMBERS = 10
+
+# Near-duplicate function detection: token shingle length, functions with
+# fewer tokens are skipped, MinHash signature length, and LSH bands (of
+# SIMILARITY_PERMUTATIONS // SIMILARITY_BANDS signature rows each)
+SHINGLE_SIZE = 5
+SIMILARITY_MIN_TOKENS = 20
+SIMILARITY_PERMUTATIONS = 64
+SIMILARITY_BANDS = 16
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Rabin-Karp rolling hash over token hashes, modulo a Mersenne prime
+_ROLLING_BASE = 1000003
+_ROLLING_MOD = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+
+# MinHash multiply-shift parameters; stdlib-seeded so the numpy and pure
+# Python signatures are identical
+_rng = random.Random(0)
+_MINHASH_A = [_rng.getrandbits(64) | 1 for _ in range(SIMILARITY_PERMUTATIONS)]
+_MINHASH_B = [_rng.getrandbits(64) for _ in range(SIMILARITY_PERMUTATIONS)]
+del _rng
+
+if HAS_NUMPY:
+    _MINHASH_A_COLUMN = np.array(_MINHASH_A, dtype=np.uint64)[:, None]
+    _MINHASH_B_COLUMN = np.array(_MINHASH_B, dtype=np.uint64)[:, None]
+
+def _shingles(tokens: List[str]) -> Set[int]:
+    """
+    Hash every run of SHINGLE_SIZE consecutive tokens (Rabin-Karp)
+    
+    Args:
+        tokens: Code tokens, in order
+        
+    Returns:
+        Set of shingle hashes
+    """
+    values = [zlib.crc32(token.encode('utf-8', 'surrogatepass')) for token in tokens]
+    drop = pow(_ROLLING_BASE, SHINGLE_SIZE - 1, _ROLLING_MOD)
+    
+    shingles = set()
+    rolling = 0
+    for i, value in enumerate(values):
+        if i >= SHINGLE_SIZE:
+            # Slide the window: remove the token that falls out of it
+            rolling = (rolling - values[i - SHINGLE_SIZE] * drop) % _ROLLING_MOD
+        rolling = (rolling * _ROLLING_BASE + value) % _ROLLING_MOD
+        if i >= SHINGLE_SIZE - 1:
+            shingles.add(rolling)
+    return shingles
+
+def _minhash(shingles: Set[int]) -> List[int]:
+    """
+    MinHash signature of a shingle set
+    
+    Args:
+        shingles: Shingle hashes (non-empty)
+        
+    Returns:
+        SIMILARITY_PERMUTATIONS minimum hash values
+    """
+    if HAS_NUMPY:
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # uint64 arithmetic wraps modulo 2**64
+        return ((_MINHASH_A_COLUMN * x + _MINHASH_B_COLUMN) >> np.uint64(32)).min(axis=1).tolist()
+    return [min(((a * x + b) & _MASK64) >> 32 for x in shingles)
+            for a, b in zip(_MINHASH_A, _MINHASH_B)]
+
+@lru_cache(maxsize=None)
+def _compiled_pattern(name: str) -> re.Pattern:
+    """Compile a smell pattern once per process"""
+    return re.compile(SMELL_PATTERNS[name])
+
 class CodeSmellDetector:
     """Detect code smells and anti-patterns"""
     
@@ -18,6 +119,20 @@ class CodeSmellDetector:
         self.max_class_length = config['quality'].get('max_class_length', 300)
         self.duplicate_threshold = config['quality'].get('duplicate_threshold', 0.8)
     
+    def precompile(self) -> int:
+        """
+        Compile all smell patterns up front instead of on first use
+        
+        Returns:
+            Number of compiled patterns in the cache
+        """
+        for name in SMELL_PATTERNS:
+            _compiled_pattern(name)
+        
+        cached = _compiled_pattern.cache_info().currsize
+        logger.debug(f"Precompiled {cached} code smell patterns")
+        return cached
+    
     def detect_smells(self, parsed_data: Dict, content: str) -> Dict:
         """
         Detect code smells in a file
@@ -112,7 +227,7 @@ class CodeSmellDetector:
         for func in parsed_data.get('functions', []):
             params = func.get('parameters', [])
             # Filter out 'self' and 'cls'
-            real_params = [p for p in params if p not in ['self', 'cls']]
+            real_params = [p for p in params if p not in _IMPLICIT_PARAMS]
             
             if len(real_params) > max_params:
                 many_params.append({
@@ -131,32 +246,26 @@ class CodeSmellDetector:
         """
         dead_code = []
         
-        # Get all function names
-        all_functions = {func['name'] for func in parsed_data.get('functions', [])}
-        
-        # Get all function calls across all functions
+        # First definition of each function name, and the names of all
+        # calls made by any function (method calls by their last part)
+        func_by_name = {}
         all_calls = set()
         for func in parsed_data.get('functions', []):
-            calls = func.get('calls', [])
-            for call in calls:
-                # Extract function name from call (handle method calls)
-                call_name = call.split('.')[-1] if '.' in call else call
-                all_calls.add(call_name)
+            func_by_name.setdefault(func['name'], func)
+            for call in func.get('calls', []):
+                all_calls.add(call.rpartition('.')[2])
         
         # Find functions that are never called
         # Exclude special methods and main functions
-        for func_name in all_functions:
+        for func_name, func_data in func_by_name.items():
             if (func_name not in all_calls and 
                 not func_name.startswith('__') and 
-                func_name not in ['main', 'run', 'execute']):
-                
-                func_data = next((f for f in parsed_data['functions'] if f['name'] == func_name), None)
-                if func_data:
-                    dead_code.append({
-                        'name': func_name,
-                        'line': func_data.get('line_start'),
-                        'note': 'Potentially unused (not called within file)'
-                    })
+                func_name not in _ENTRY_POINT_NAMES):
+                dead_code.append({
+                    'name': func_name,
+                    'line': func_data.get('line_start'),
+                    'note': 'Potentially unused (not called within file)'
+                })
         
         return dead_code
     
@@ -164,26 +273,37 @@ class CodeSmellDetector:
         """Detect magic numbers (hardcoded numeric values)"""
         magic_numbers = []
         
-        # Pattern to find numeric literals (excluding 0, 1, -1)
-        pattern = r'\b(?<![\w.])\d{2,}\b(?![\w.])'
+        # One pass over the whole file; line numbers and lines are only
+        # worked out for candidate matches
+        line_num = 1
+        counted_to = 0
         
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
+        for match in _compiled_pattern('magic_number').finditer(content):
+            number = match.group()
+            if number in _ACCEPTABLE_NUMBERS:
+                continue
+            
+            start = match.start()
+            line_num += content.count('\n', counted_to, start)
+            counted_to = start
+            
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', start)
+            line = content[line_start:line_end] if line_end >= 0 else content[line_start:]
+            
             # Skip comments and strings
             if line.strip().startswith('#') or '"""' in line or "'''" in line:
                 continue
             
-            matches = re.finditer(pattern, line)
-            for match in matches:
-                number = match.group()
-                if number not in ['0', '1', '10', '100']:  # Common acceptable numbers
-                    magic_numbers.append({
-                        'number': number,
-                        'line': line_num,
-                        'context': line.strip()[:50]
-                    })
-        
-        return magic_numbers[:10]  # Limit to first 10
+            magic_numbers.append({
+                'number': number,
+                'line': line_num,
+                'context': line.strip()[:50]
+            })
+            if len(magic_numbers) == MAX_MAGIC_NUMBERS:
+                break
+        
+        return magic_numbers
     
     def _detect_global_vars(self, parsed_data: Dict) -> List[Dict]:
         """Detect global variables (potential smell)"""
@@ -208,25 +328,105 @@ class CodeSmellDetector:
             List of duplicate code blocks
         """
         duplicates = []
-        function_signatures = defaultdict(list)
-        
-        # Collect all function signatures
-        for file_data in all_parsed_data:
-            for func in file_data.get('functions', []):
-                signature = f"{func['name']}_{len(func.get('parameters', []))}"
-                function_signatures[signature].append({
-                    'file': file_data['filepath'],
-                    'function': func['name'],
-                    'line': func.get('line_start')
-                })
+        
+        # Count signatures (name, parameter count) first, so occurrence
+        # records are only built for the few that repeat
+        counts = Counter(
+            (func['name'], len(func.get('parameters', [])))
+            for file_data in all_parsed_data
+            for func in file_data.get('functions', [])
+        )
+        
+        # Collect occurrences of repeated signatures, in first-seen order
+        function_signatures = {signature: [] for signature, count in counts.items() if count > 1}
+        if function_signatures:
+            for file_data in all_parsed_data:
+                for func in file_data.get('functions', []):
+                    occurrences = function_signatures.get(
+                        (func['name'], len(func.get('parameters', [])))
+                    )
+                    if occurrences is not None:
+                        occurrences.append({
+                            'file': file_data['filepath'],
+                            'function': func['name'],
+                            'line': func.get('line_start')
+                        })
         
         # Find duplicates
-        for signature, occurrences in function_signatures.items():
-            if len(occurrences) > 1:
-                duplicates.append({
-                    'signature': signature.split('_')[0],
-                    'occurrences': occurrences,
-                    'count': len(occurrences)
-                })
+        for (name, _), occurrences in function_signatures.items():
+            duplicates.append({
+                'signature': name.split('_')[0],
+                'occurrences': occurrences,
+                'count': len(occurrences)
+            })
+        
+        return duplicates
+    
+    def detect_similar_functions(self, files: List[Tuple[Dict, str]]) -> List[Dict]:
+        """
+        Detect near-duplicate functions (copy-paste) across files
+        
+        Function bodies are split into tokens and hashed as overlapping
+        SHINGLE_SIZE-token shingles. MinHash signatures estimate the
+        Jaccard similarity of two shingle sets, and LSH banding picks the
+        candidate pairs, so no all-pairs comparison is made.
+        
+        Args:
+            files: (parsed data, file content) pairs
+            
+        Returns:
+            Pairs of functions with estimated similarity of at least
+            duplicate_threshold, most similar first
+        """
+        functions = []
+        signatures = []
+        
+        for parsed_data, content in files:
+            lines = content.split('\n')
+            for func in parsed_data.get('functions', []):
+                start, end = func.get('line_start'), func.get('line_end')
+                if not start or not end:
+                    continue
+                
+                tokens = _TOKEN_RE.findall('\n'.join(lines[start - 1:end]).lower())
+                if len(tokens) < SIMILARITY_MIN_TOKENS:
+                    continue
+                
+                functions.append((parsed_data.get('filepath'), func['name'], start, end))
+                signatures.append(_minhash(_shingles(tokens)))
+        
+        # Functions sharing every row of some band are candidates
+        rows = SIMILARITY_PERMUTATIONS // SIMILARITY_BANDS
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            for band in range(SIMILARITY_BANDS):
+                buckets[band, tuple(signature[band * rows:(band + 1) * rows])].append(i)
+        
+        similar = []
+        seen = set()
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if (i, j) in seen:
+                        continue
+                    seen.add((i, j))
+                    
+                    file_i, name_i, start_i, end_i = functions[i]
+                    file_j, name_j, start_j, end_j = functions[j]
+                    # A nested function is part of its enclosing one
+                    if file_i == file_j and start_i <= end_j and start_j <= end_i:
+                        continue
+                    
+                    matches = sum(a == b for a, b in zip(signatures[i], signatures[j]))
+                    similarity = matches / SIMILARITY_PERMUTATIONS
+                    if similarity >= self.duplicate_threshold:
+                        similar.append({
+                            'functions': [
+                                {'file': file_i, 'function': name_i, 'line': start_i},
+                                {'file': file_j, 'function': name_j, 'line': start_j}
+                            ],
+                            'similarity': round(similarity, 2)
+                        })
         
-        return duplicates
\ No newline at end of file
+        similar.sort(key=lambda pair: pair['similarity'], reverse=True)
+        return similar
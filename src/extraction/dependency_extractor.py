@@ -3,11 +3,69 @@ Dependency Extractor Module
 Extract and analyze file dependencies
 """
 
+import heapq
+from bisect import bisect_right
+from itertools import islice
+from operator import itemgetter
 from typing import Dict, List, Set
 from collections import defaultdict
 import networkx as nx
 from src.utils.logger import logger
 
+# Most circular dependencies listed in the analysis
+MAX_REPORTED_CYCLES = 5
+
+class _PathIndex:
+    """
+    Find the filepaths containing a module path fragment
+    
+    All paths are joined into one NUL-separated buffer, so a fragment is
+    searched for with str.find over the buffer (in C) rather than with a
+    containment test per path. Results are memoized per fragment.
+    """
+    
+    def __init__(self, filepaths: List[str]):
+        self.filepaths = filepaths
+        self.buffer = '\0'.join(filepaths)
+        
+        # Buffer offset at which each path starts
+        self.starts = []
+        offset = 0
+        for filepath in filepaths:
+            self.starts.append(offset)
+            offset += len(filepath) + 1
+        
+        self._found: Dict[str, List[str]] = {}
+    
+    def containing(self, fragment: str) -> List[str]:
+        """
+        Get the filepaths that contain fragment, in filepath order
+        
+        Args:
+            fragment: Substring to look for (e.g. "pkg/module")
+            
+        Returns:
+            Matching filepaths
+        """
+        found = self._found.get(fragment)
+        if found is not None:
+            return found
+        
+        found = []
+        if self.filepaths and '\0' not in fragment:
+            buffer = self.buffer
+            position = buffer.find(fragment)
+            while position >= 0:
+                # Report the path once, then continue after it
+                index = bisect_right(self.starts, position) - 1
+                found.append(self.filepaths[index])
+                if index + 1 == len(self.starts):
+                    break
+                position = buffer.find(fragment, self.starts[index + 1])
+        
+        self._found[fragment] = found
+        return found
+
 class DependencyExtractor:
     """Extract and analyze code dependencies"""
     
@@ -27,8 +85,8 @@ class DependencyExtractor:
         """
         logger.info("Extracting dependencies...")
         
-        # Build file mapping
-        file_map = {data['filepath']: data for data in all_parsed_data}
+        # Index of all filepaths, searched when resolving imports
+        path_index = _PathIndex(list(dict.fromkeys(data['filepath'] for data in all_parsed_data)))
         
         # Extract imports and build dependency graph
         for file_data in all_parsed_data:
@@ -40,7 +98,7 @@ class DependencyExtractor:
             
             # Process imports
             for import_data in imports:
-                dependencies = self._resolve_import(import_data, file_map)
+                dependencies = self._resolve_import(import_data, path_index)
                 for dep in dependencies:
                     self.file_dependencies[filepath].add(dep)
                     self.dependency_graph.add_edge(filepath, dep)
@@ -58,13 +116,13 @@ class DependencyExtractor:
             'analysis': analysis
         }
     
-    def _resolve_import(self, import_data: Dict, file_map: Dict) -> List[str]:
+    def _resolve_import(self, import_data: Dict, path_index: _PathIndex) -> List[str]:
         """
         Resolve import to actual file dependencies
         
         Args:
             import_data: Import information
-            file_map: Mapping of filepaths to parsed data
+            path_index: Index of all filepaths being analyzed
             
         Returns:
             List of resolved file dependencies
@@ -77,43 +135,37 @@ class DependencyExtractor:
             for module in modules:
                 # Try to find corresponding file
                 module_path = module.replace('.', '/')
-                for filepath in file_map.keys():
-                    if module_path in filepath:
-                        dependencies.append(filepath)
+                dependencies.extend(path_index.containing(module_path))
         
         elif import_data['type'] == 'from_import':
             # Handle: from module import name
             module = import_data.get('module', '')
             if module:
                 module_path = module.replace('.', '/')
-                for filepath in file_map.keys():
-                    if module_path in filepath:
-                        dependencies.append(filepath)
+                dependencies.extend(path_index.containing(module_path))
         
         return dependencies
     
     def _analyze_dependencies(self) -> Dict:
         """Analyze dependency graph for insights"""
         
-        # Most depended upon files (incoming edges)
-        in_degrees = dict(self.dependency_graph.in_degree())
-        most_depended = sorted(in_degrees.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Most depended upon files (incoming edges); nlargest keeps
+        # sorted()'s order for ties
+        most_depended = heapq.nlargest(5, self.dependency_graph.in_degree(), key=itemgetter(1))
         
         # Files with most dependencies (outgoing edges)
-        out_degrees = dict(self.dependency_graph.out_degree())
-        most_dependencies = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:5]
+        most_dependencies = heapq.nlargest(5, self.dependency_graph.out_degree(), key=itemgetter(1))
         
-        # Detect circular dependencies
+        # Detect circular dependencies; simple_cycles is lazy, so only the
+        # first 5 are enumerated (all of them can be exponentially many)
         circular = []
         try:
-            cycles = list(nx.simple_cycles(self.dependency_graph))
-            circular = cycles[:5]  # Limit to first 5
+            circular = list(islice(nx.simple_cycles(self.dependency_graph), MAX_REPORTED_CYCLES))
         except:
             pass
         
         # Isolated files (no dependencies)
-        isolated = [node for node in self.dependency_graph.nodes() 
-                   if self.dependency_graph.degree(node) == 0]
+        isolated = [node for node, degree in self.dependency_graph.degree() if degree == 0]
         
         return {
             'most_depended_upon': [
@@ -145,12 +197,16 @@ class DependencyExtractor:
         Returns:
             Dictionary with nodes and edges
         """
+        # Degree views built once (graph.in_degree(node) builds one per call)
+        in_degrees = self.dependency_graph.in_degree
+        out_degrees = self.dependency_graph.out_degree
+        
         nodes = [
             {
                 'id': node,
-                'label': node.split('/')[-1],  # Just filename
-                'in_degree': self.dependency_graph.in_degree(node),
-                'out_degree': self.dependency_graph.out_degree(node)
+                'label': node.rpartition('/')[2],  # Just filename
+                'in_degree': in_degrees[node],
+                'out_degree': out_degrees[node]
             }
             for node in self.dependency_graph.nodes()
         ]
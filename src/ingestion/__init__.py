@@ -2,7 +2,14 @@
 Ingestion module - Code loading and file filtering
 """
 
-from src.ingestion.code_loader import CodeLoader
-from src.ingestion.file_filter import FileFilter
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'CodeLoader': 'src.ingestion.code_loader',
+    'FileFilter': 'src.ingestion.file_filter'
+}
 
 __all__ = ['CodeLoader', 'FileFilter']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
@@ -9,6 +9,8 @@ import stat
 import shutil
 import subprocess
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import List, Dict, Optional
 from git import Repo
@@ -16,6 +18,20 @@ from git.exc import GitCommandError, InvalidGitRepositoryError
 from src.utils.logger import logger
 from src.utils.helpers import is_binary_file, format_bytes
 
+# File extensions by language, for filter_by_language
+_LANGUAGE_EXTENSIONS = {
+    'python': frozenset({'.py'}),
+    'javascript': frozenset({'.js', '.jsx'}),
+    'java': frozenset({'.java'}),
+    'cpp': frozenset({'.cpp', '.h', '.hpp'}),
+    'c': frozenset({'.c', '.h'})
+}
+
+# GitHub URL suffixes stripped by _normalize_github_url
+_TREE_PATH_RE = re.compile(r'/tree/[^/]+.*$')
+_BLOB_PATH_RE = re.compile(r'/blob/[^/]+.*$')
+_PAGE_PATH_RE = re.compile(r'/(pulls|issues|actions|wiki|projects|releases|tags|commits).*$')
+
 class CodeLoader:
     """Load and prepare codebase for analysis"""
     
@@ -24,6 +40,8 @@ class CodeLoader:
         self.exclude_dirs = set(config['analysis'].get('exclude_dirs', []))
         self.exclude_extensions = set(config['analysis'].get('exclude_extensions', []))
         self.max_file_size = config['analysis'].get('max_file_size_mb', 10) * 1024 * 1024
+        self.io_workers = (config['analysis'].get('io_workers')
+                           or min(32, (os.cpu_count() or 1) * 4))
         
     def load_from_local(self, path: str) -> Dict:
         """
@@ -226,13 +244,13 @@ class CodeLoader:
             url = 'https://' + url
         
         # Remove tree/branch paths (e.g., /tree/main, /tree/master, /tree/branch-name)
-        url = re.sub(r'/tree/[^/]+.*$', '', url)
+        url = _TREE_PATH_RE.sub('', url)
         
         # Remove blob paths (e.g., /blob/main/file.py)
-        url = re.sub(r'/blob/[^/]+.*$', '', url)
+        url = _BLOB_PATH_RE.sub('', url)
         
         # Remove /pulls, /issues, /actions etc.
-        url = re.sub(r'/(pulls|issues|actions|wiki|projects|releases|tags|commits).*$', '', url)
+        url = _PAGE_PATH_RE.sub('', url)
         
         # Add .git if missing (for HTTPS URLs)
         if url.startswith('https://') and not url.endswith('.git'):
@@ -261,57 +279,89 @@ class CodeLoader:
         """
         Recursively scan directory and collect file information
         
+        Paths are filtered in one walk that never descends into excluded
+        directories; the files are then checked on a thread pool (file I/O
+        releases the GIL). File contents are not kept; see load_content.
+        
         Args:
             root_path: Root directory path
             
         Returns:
-            List of file dictionaries
+            List of file dictionaries (without content)
         """
-        files = []
+        candidates = []
+        
+        # Skip excluded directories (any path component, the root's too)
+        if any(excluded in root_path.parts for excluded in self.exclude_dirs):
+            return []
         
-        for item in root_path.rglob('*'):
-            # Skip directories
-            if item.is_dir():
-                continue
+        for dirpath, dirnames, filenames in os.walk(root_path):
+            # Prune excluded directories before descending into them
+            dirnames[:] = [name for name in dirnames if name not in self.exclude_dirs]
             
-            # Skip excluded directories
-            if any(excluded in item.parts for excluded in self.exclude_dirs):
-                continue
+            for name in filenames:
+                if name in self.exclude_dirs:
+                    continue
+                
+                item = Path(dirpath, name)
+                
+                # Skip excluded extensions
+                if item.suffix in self.exclude_extensions:
+                    continue
+                
+                candidates.append(item)
+        
+        if len(candidates) < 2 or self.io_workers == 1:
+            results = [self._inspect_file(item, root_path) for item in candidates]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.io_workers, len(candidates))) as executor:
+                results = list(executor.map(self._inspect_file, candidates,
+                                            repeat(root_path)))
+        
+        return [file_info for file_info in results if file_info is not None]
+    
+    def _inspect_file(self, item: Path, root_path: Path) -> Optional[Dict]:
+        """
+        Check one file and count its lines
+        
+        Args:
+            item: File path
+            root_path: Root directory path
             
-            # Skip excluded extensions
-            if item.suffix in self.exclude_extensions:
-                continue
+        Returns:
+            File dictionary, or None if the file is skipped
+        """
+        # Skip binary files
+        if is_binary_file(str(item)):
+            return None
+        
+        # Check file size
+        file_size = item.stat().st_size
+        if file_size > self.max_file_size:
+            logger.warning(f"Skipping large file: {item} ({format_bytes(file_size)})")
+            return None
+        
+        # Add file info
+        try:
+            with open(item, 'rb') as f:
+                data = f.read()
             
-            # Skip binary files
-            if is_binary_file(str(item)):
-                continue
+            # Line breaks as text mode reads them: \n, \r\n and a lone \r
+            # (decoding with errors='ignore' never drops these bytes)
+            line_breaks = data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
             
-            # Check file size
-            file_size = item.stat().st_size
-            if file_size > self.max_file_size:
-                logger.warning(f"Skipping large file: {item} ({format_bytes(file_size)})")
-                continue
+            return {
+                'path': str(item),
+                'relative_path': str(item.relative_to(root_path)),
+                'name': item.name,
+                'extension': item.suffix,
+                'size': file_size,
+                'lines': line_breaks + 1
+            }
             
-            # Add file info
-            try:
-                with open(item, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                files.append({
-                    'path': str(item),
-                    'relative_path': str(item.relative_to(root_path)),
-                    'name': item.name,
-                    'extension': item.suffix,
-                    'size': file_size,
-                    'lines': content.count('\n') + 1,
-                    'content': content
-                })
-                
-            except Exception as e:
-                logger.warning(f"Error reading file {item}: {e}")
-                continue
-        
-        return files
+        except Exception as e:
+            logger.warning(f"Error reading file {item}: {e}")
+            return None
     
     def filter_by_language(self, files: List[Dict], language: str = 'python') -> List[Dict]:
         """
@@ -324,16 +374,27 @@ class CodeLoader:
         Returns:
             Filtered list of files
         """
-        extension_map = {
-            'python': ['.py'],
-            'javascript': ['.js', '.jsx'],
-            'java': ['.java'],
-            'cpp': ['.cpp', '.h', '.hpp'],
-            'c': ['.c', '.h']
-        }
-        
-        target_extensions = extension_map.get(language.lower(), ['.py'])
+        target_extensions = _LANGUAGE_EXTENSIONS.get(language.lower(), _LANGUAGE_EXTENSIONS['python'])
         filtered = [f for f in files if f['extension'] in target_extensions]
         
         logger.info(f"Filtered to {len(filtered)} {language} files")
-        return filtered
\ No newline at end of file
+        return filtered
+
+def load_content(file_info: Dict) -> str:
+    """
+    Get the text of a file found by CodeLoader
+    
+    Scan results hold no content (so a codebase is never held in memory
+    at once); it is read here when a file is analyzed.
+    
+    Args:
+        file_info: File dictionary from CodeLoader
+        
+    Returns:
+        File content ('content' itself if the dictionary has one)
+    """
+    content = file_info.get('content')
+    if content is None:
+        with open(file_info['path'], 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    return content
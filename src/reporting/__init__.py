@@ -2,7 +2,14 @@
 Reporting module - Report generation in various formats
 """
 
-from src.reporting.html_generator import HTMLGenerator
-from src.reporting.markdown_generator import MarkdownGenerator
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'HTMLGenerator': 'src.reporting.html_generator',
+    'MarkdownGenerator': 'src.reporting.markdown_generator'
+}
 
 __all__ = ['HTMLGenerator', 'MarkdownGenerator']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
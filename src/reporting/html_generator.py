@@ -9,6 +9,7 @@ from datetime import datetime
 from jinja2 import Template, Environment, FileSystemLoader
 import json
 from src.utils.logger import logger
+from src.utils.helpers import ensure_dir
 
 class HTMLGenerator:
     """Generate interactive HTML reports"""
@@ -20,8 +21,7 @@ class HTMLGenerator:
         Args:
             output_dir: Directory for output files
         """
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensure_dir(output_dir)
         
         # Load templates
         template_dir = Path(__file__).parent
@@ -7,13 +7,13 @@ from pathlib import Path
 from typing import Dict, List
 from datetime import datetime
 from src.utils.logger import logger
+from src.utils.helpers import ensure_dir
 
 class MarkdownGenerator:
     """Generate Markdown reports"""
     
     def __init__(self, output_dir: str = "./outputs/reports"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensure_dir(output_dir)
     
     def generate_report(self, results: Dict, filename: str = "analysis_report.md") -> str:
         """
@@ -316,21 +316,18 @@ class MarkdownGenerator:
             smells = file_data.get('code_smells', {}).get('smells', {})
             filepath = file_data.get('filepath', '')
             
+            # Copy rather than tag in place: results may be read concurrently
             for func in smells.get('long_functions', []):
-                func['file'] = filepath
-                all_long_funcs.append(func)
+                all_long_funcs.append({**func, 'file': filepath})
             
             for item in smells.get('missing_docstrings', []):
-                item['file'] = filepath
-                all_missing_docs.append(item)
+                all_missing_docs.append({**item, 'file': filepath})
             
             for item in smells.get('dead_code', []):
-                item['file'] = filepath
-                all_dead_code.append(item)
+                all_dead_code.append({**item, 'file': filepath})
             
             for item in smells.get('magic_numbers', []):
-                item['file'] = filepath
-                all_magic_numbers.append(item)
+                all_magic_numbers.append({**item, 'file': filepath})
         
         # Long functions
         if all_long_funcs:
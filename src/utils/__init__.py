@@ -2,18 +2,26 @@
 Utils module - Helper utilities and logging
 """
 
+from src.utils.lazy import lazy_module
+
+# The logger is needed by every module, so it loads eagerly (a lazy name
+# would also be shadowed by the src.utils.logger submodule)
 from src.utils.logger import logger, setup_logger, get_logger
-from src.utils.helpers import (
-    load_config,
-    get_default_config,
-    get_file_hash,
-    count_lines,
-    sanitize_filename,
-    create_output_dir,
-    format_bytes,
-    is_binary_file,
-    truncate_text
-)
+
+# Helpers (which import yaml) and the modules they live in; imported on
+# first access
+_LAZY_IMPORTS = {
+    'load_config': 'src.utils.helpers',
+    'get_default_config': 'src.utils.helpers',
+    'get_file_hash': 'src.utils.helpers',
+    'count_lines': 'src.utils.helpers',
+    'sanitize_filename': 'src.utils.helpers',
+    'create_output_dir': 'src.utils.helpers',
+    'ensure_dir': 'src.utils.helpers',
+    'format_bytes': 'src.utils.helpers',
+    'is_binary_file': 'src.utils.helpers',
+    'truncate_text': 'src.utils.helpers'
+}
 
 __all__ = [
     'logger',
@@ -25,7 +33,10 @@ __all__ = [
     'count_lines',
     'sanitize_filename',
     'create_output_dir',
+    'ensure_dir',
     'format_bytes',
     'is_binary_file',
     'truncate_text'
 ]
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
@@ -6,14 +6,20 @@ Common functions used across modules
 import os
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Union
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
-    """Load configuration from YAML file"""
+    """Load configuration from YAML file (with libyaml when available)"""
     try:
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YamlLoader)
     except FileNotFoundError:
         return get_default_config()
 
@@ -66,15 +72,40 @@ def sanitize_filename(filename: str) -> str:
         filename = filename.replace(char, '_')
     return filename
 
+# Absolute paths of directories already created (or found) by ensure_dir
+# in this process
+_ensured_dirs: Set[str] = set()
+
+def ensure_dir(path: Union[str, Path], refresh: bool = False) -> Path:
+    """
+    Create a directory (and parents) once per process
+    
+    Repeated calls for the same path skip the mkdir/stat syscalls. A
+    directory deleted after it was ensured is not noticed; writers that
+    then get FileNotFoundError call again with refresh=True.
+    
+    Args:
+        path: Directory to create
+        refresh: Create the directory even if it was ensured before
+        
+    Returns:
+        The directory as a Path
+    """
+    path = Path(path)
+    key = os.path.abspath(path)
+    if refresh or key not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(key)
+    return path
+
 def create_output_dir(base_dir: str = "./outputs") -> Path:
     """Create output directory structure"""
-    output_path = Path(base_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    output_path = ensure_dir(base_dir)
     
     # Create subdirectories
-    (output_path / "reports").mkdir(exist_ok=True)
-    (output_path / "graphs").mkdir(exist_ok=True)
-    (output_path / "visualizations").mkdir(exist_ok=True)
+    ensure_dir(output_path / "reports")
+    ensure_dir(output_path / "graphs")
+    ensure_dir(output_path / "visualizations")
     
     return output_path
 
@@ -0,0 +1,33 @@
+"""
+Lazy Import Module
+Load package re-exports on first access (PEP 562)
+"""
+
+from importlib import import_module
+from typing import Callable, Dict, Tuple
+
+def lazy_module(mapping: Dict[str, str], globals_: Dict) -> Tuple[Callable, Callable]:
+    """
+    Build a package's module-level __getattr__ and __dir__
+
+    Args:
+        mapping: Public names and the modules they live in
+        globals_: The package's globals(); imported names are cached there
+
+    Returns:
+        (__getattr__, __dir__) functions for the package
+    """
+    package = globals_['__name__']
+
+    def __getattr__(name):
+        """Import public names on first access"""
+        if name in mapping:
+            value = getattr(import_module(mapping[name]), name)
+            globals_[name] = value
+            return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(globals_) | set(globals_.get('__all__', mapping)))
+
+    return __getattr__, __dir__
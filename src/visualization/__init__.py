@@ -2,7 +2,14 @@
 Visualization module - Graph and chart generation
 """
 
-from src.visualization.graph_generator import GraphGenerator
-from src.visualization.chart_creator import ChartCreator
+from src.utils.lazy import lazy_module
+
+# Public classes and the modules they live in; imported on first access
+_LAZY_IMPORTS = {
+    'GraphGenerator': 'src.visualization.graph_generator',
+    'ChartCreator': 'src.visualization.chart_creator'
+}
 
 __all__ = ['GraphGenerator', 'ChartCreator']
+
+__getattr__, __dir__ = lazy_module(_LAZY_IMPORTS, globals())
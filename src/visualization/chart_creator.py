@@ -25,6 +25,7 @@ except ImportError:
     HAS_MATPLOTLIB = False
 
 from src.utils.logger import logger
+from src.utils.helpers import ensure_dir
 
 class ChartCreator:
     """Create various charts and visualizations"""
@@ -36,8 +37,7 @@ class ChartCreator:
         Args:
             output_dir: Directory for output files
         """
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensure_dir(output_dir)
         
         # Color palette
         self.colors = {
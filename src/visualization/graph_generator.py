@@ -12,13 +12,13 @@ import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 from src.utils.logger import logger
+from src.utils.helpers import ensure_dir
 
 class GraphGenerator:
     """Generate visual graphs and charts"""
     
     def __init__(self, output_dir: str = "./outputs/graphs"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensure_dir(output_dir)
         
     def generate_dependency_graph(self, graph: nx.DiGraph, 
                                   filename: str = "dependency_graph.png") -> str:
@@ -4,10 +4,12 @@ Unit tests for Complexity Analyzer and Code Analysis modules
 
 import pytest
 from src.analysis.complexity_analyzer import ComplexityAnalyzer
-from src.analysis.metrics_calculator import MetricsCalculator
+from src.analysis.metrics_calculator import MetricsCalculator, RepoMetricsAccumulator
 from src.analysis.ast_parser import ASTParser
 from src.extraction.code_smell_detector import CodeSmellDetector
 from src.extraction.dependency_extractor import DependencyExtractor
+from src.extraction import call_graph_builder
+from src.ai_engine.model_manager import ModelManager
 
 # Sample code for testing
 SIMPLE_CODE = """
@@ -165,6 +167,36 @@ class TestComplexityAnalyzer:
         
         assert result is not None
         assert result['cyclomatic_complexity']['average'] == 0
+    
+    def test_reuses_parsed_tree(self, config):
+        """Test a pre-parsed AST gives the same metrics as parsing content"""
+        analyzer = ComplexityAnalyzer(config)
+        parsed = ASTParser().parse_file("test.py", COMPLEX_CODE, keep_tree=True)
+        tree = parsed.pop('_ast')
+        
+        assert analyzer.analyze_file("test.py", COMPLEX_CODE, tree=tree) == \
+            analyzer.analyze_file("test.py", COMPLEX_CODE)
+    
+    def test_identical_content_cached(self, config):
+        """Test files with identical content share one analysis"""
+        analyzer = ComplexityAnalyzer(config)
+        first = analyzer.analyze_file("a.py", COMPLEX_CODE)
+        second = analyzer.analyze_file("b.py", COMPLEX_CODE)
+        
+        assert len(analyzer._results) == 1
+        assert second['filepath'] == "b.py"
+        assert {**second, 'filepath': "a.py"} == first
+    
+    def test_cached_results_are_independent(self, config):
+        """Test modifying one file's result leaves the cached analysis intact"""
+        analyzer = ComplexityAnalyzer(config)
+        first = analyzer.analyze_file("a.py", COMPLEX_CODE)
+        first['cyclomatic_complexity']['functions'].clear()
+        second = analyzer.analyze_file("b.py", COMPLEX_CODE)
+        second['cyclomatic_complexity']['functions'][0]['name'] = 'renamed'
+        third = analyzer.analyze_file("c.py", COMPLEX_CODE)
+        
+        assert third['cyclomatic_complexity']['functions'][0]['name'] == 'complex_function'
 
 
 class TestMetricsCalculator:
@@ -200,6 +232,46 @@ class TestMetricsCalculator:
         assert loc['total'] > 0
         assert loc['source'] > 0
     
+    def test_docstring_lines(self):
+        """Test one-line and multiline docstrings don't swallow code lines"""
+        code = (
+            'def f():\n'
+            '    """One line"""\n'
+            '    return 1\n'
+            '\n'
+            'def g():\n'
+            '    """\n'
+            '    Multi\n'
+            '    """\n'
+            '    x = """a""" + "b"\n'
+            '    return x\n'
+        )
+        metrics = MetricsCalculator().calculate_file_metrics("test.py", code, {})
+        
+        loc = metrics['lines_of_code']
+        assert (loc['source'], loc['comments'], loc['blank']) == (5, 4, 2)
+    
+    def test_repo_metrics_accumulator(self):
+        """Test streamed aggregation matches the repository metrics"""
+        calculator = MetricsCalculator()
+        parser = ASTParser()
+        files = [calculator.calculate_file_metrics(name, code, parser.parse_file(name, code))
+                 for name, code in (("a.py", SIMPLE_CODE), ("b.py", COMPLEX_CODE))]
+        
+        accumulator = RepoMetricsAccumulator()
+        for metrics in files:
+            accumulator.add(metrics)
+        
+        repo = accumulator.finalize()
+        assert repo == calculator.calculate_repository_metrics(files)
+        assert repo['total_files'] == 2
+        assert repo['per_language']['Python']['files'] == 2
+        assert RepoMetricsAccumulator().finalize()['total_files'] == 0
+        
+        # Later additions do not change an earlier snapshot
+        accumulator.add(files[0])
+        assert repo['per_language']['Python']['files'] == 2
+    
     def test_documentation_coverage(self):
         """Test documentation coverage calculation"""
         calculator = MetricsCalculator()
@@ -271,6 +343,33 @@ class TestCodeSmellDetector:
         # global_counter should be detected (not a constant)
         var_names = [v['name'] for v in global_vars]
         assert 'global_counter' in var_names
+    
+    def test_precompiled_magic_numbers(self, config):
+        """Test magic numbers are found with precompiled patterns"""
+        detector = CodeSmellDetector(config)
+        assert detector.precompile() >= 1
+        
+        code = "timeout = 42\nretries = 1\n"
+        parsed = ASTParser().parse_file("test.py", code)
+        smells = detector.detect_smells(parsed, code)
+        
+        numbers = [m['number'] for m in smells['smells']['magic_numbers']]
+        assert numbers == ['42']
+    
+    def test_detect_similar_functions(self, config):
+        """Test copied functions are found across files"""
+        detector = CodeSmellDetector(config)
+        parser = ASTParser()
+        
+        copied = COMPLEX_CODE.replace("complex_function", "copied_function")
+        files = [(parser.parse_file(name, code), code)
+                 for name, code in (("a.py", COMPLEX_CODE), ("b.py", copied),
+                                    ("c.py", SIMPLE_CODE))]
+        
+        similar = detector.detect_similar_functions(files)
+        assert len(similar) == 1
+        assert {f['file'] for f in similar[0]['functions']} == {"a.py", "b.py"}
+        assert similar[0]['similarity'] >= 0.8
 
 
 class TestDependencyExtractor:
@@ -307,6 +406,88 @@ def helper():
         assert result['total_files'] == 2
 
 
+class TestCallGraphBuilder:
+    """Test cases for CallGraphBuilder"""
+    
+    def test_sparse_components_match_networkx(self, monkeypatch):
+        """Test the scipy component search finds the same cycles as networkx"""
+        pytest.importorskip('scipy')
+        import networkx as nx
+        
+        builder = call_graph_builder.CallGraphBuilder()
+        builder.call_graph = nx.gnp_random_graph(300, 0.003, seed=1, directed=True)
+        builder.call_graph.add_edge(0, 0)
+        monkeypatch.setattr(call_graph_builder, 'SPARSE_SCC_MIN_FUNCTIONS', 0)
+        
+        expected = {frozenset(c) for c in nx.strongly_connected_components(builder.call_graph)
+                    if len(c) > 1}
+        found = [frozenset(c) for c in builder._cyclic_components()]
+        
+        assert len(found) == len(expected) > 1
+        assert set(found) == expected
+    
+    def test_analysis_on_demand(self):
+        """Test skipping the analysis at build time and requesting it later"""
+        parsed = ASTParser().parse_file("test.py", COMPLEX_CODE + SIMPLE_CODE)
+        
+        eager = call_graph_builder.CallGraphBuilder().build_call_graph([parsed])
+        builder = call_graph_builder.CallGraphBuilder()
+        result = builder.build_call_graph([parsed], analyze=False)
+        
+        assert 'analysis' not in result
+        assert builder.analysis() == eager['analysis']
+
+
+class TestModelManager:
+    """Test cases for ModelManager"""
+    
+    def test_compile_failure_keeps_eager_model(self, config):
+        """Test a compiled model failing its warm-up pass is replaced by the eager one"""
+        manager = ModelManager(config)
+        eager_model, compiled_model = object(), object()
+        manager.model = eager_model
+        
+        def forward(codes):
+            if manager.model is compiled_model:
+                raise RuntimeError("no compiler toolchain")
+        manager._forward = forward
+        
+        class FakeTorch:
+            @staticmethod
+            def compile(model, **kwargs):
+                return compiled_model
+        manager._compile(FakeTorch)
+        
+        assert manager.model is eager_model
+        assert manager._static_shapes is False
+    
+    def test_similarity_matrix_methods(self, config):
+        """Test the fallback matrix is exact unless MinHash is asked for"""
+        manager = ModelManager(config)
+        codes = ["a b c d", "a b c e", "x y z"] * 30
+        
+        exact = manager.similarity_matrix(codes)
+        estimate = manager.similarity_matrix(codes, method='minhash')
+        
+        assert exact[0][1] == 3 / 5
+        assert abs(estimate[0][1] - 3 / 5) < 0.2
+        with pytest.raises(ValueError):
+            manager.similarity_matrix(codes, method='fast')
+    
+    def test_calculate_similarity_matrix(self, config):
+        """Test the batched matrix is a symmetric NxN array"""
+        np = pytest.importorskip('numpy')
+        manager = ModelManager(config)
+        codes = ["a b c d", "a b c e", "x y z"]
+        
+        matrix = manager.calculate_similarity_matrix(codes)
+        
+        assert isinstance(matrix, np.ndarray)
+        assert matrix.shape == (3, 3)
+        assert np.allclose(matrix, matrix.T)
+        assert matrix.tolist() == manager.similarity_matrix(codes)
+
+
 class TestIntegration:
     """Integration tests combining multiple modules"""
     
@@ -333,6 +514,21 @@ class TestIntegration:
         assert complexity['cyclomatic_complexity']['average'] > 0
         assert metrics['lines_of_code']['total'] > 0
         assert 'smells' in smells
+    
+    def test_file_error_gives_empty_record(self, config, tmp_path):
+        """Test a file that cannot be read yields an error record, not an exception"""
+        from main import _run_file_analysis
+        from src.ai_engine.code_summarizer import CodeSummarizer
+        
+        file_data = {'path': str(tmp_path / 'missing.py'), 'name': 'missing.py',
+                     'relative_path': 'missing.py', 'lines': 0, 'size': 0}
+        result = _run_file_analysis(ASTParser(), ComplexityAnalyzer(config),
+                                    CodeSmellDetector(config), CodeSummarizer(config),
+                                    file_data)
+        
+        assert 'error' in result
+        assert result['functions'] == []
+        assert result['code_smells']['total_smell_count'] == 0
 
 
 if __name__ == "__main__":
@@ -121,6 +121,13 @@ def test_syntax_error_handling():
     assert result['total_functions'] == 0
     assert result['total_classes'] == 0
 
+def test_non_python_file_skipped():
+    """Test non-Python and binary content is not parsed"""
+    parser = ASTParser()
+    
+    assert parser.parse_file("data.json", '{"a": 1}')['total_functions'] == 0
+    assert parser.parse_file("blob.py", "def f():\0")['functions'] == []
+
 def test_empty_file():
     """Test parsing empty file"""
     parser = ASTParser()
@@ -139,5 +146,36 @@ def test_global_variables():
     var_names = [v['name'] for v in result['global_variables']]
     assert 'global_var' in var_names
 
+def test_parse_cache(tmp_path):
+    """Test cached parse results match a fresh parse"""
+    parser = ASTParser(cache_dir=str(tmp_path))
+    first = parser.parse_file("test.py", SAMPLE_CODE)
+    assert any(tmp_path.rglob('*'))
+    
+    cached = parser.parse_file("other.py", SAMPLE_CODE)
+    assert cached['filepath'] == "other.py"
+    assert cached['functions'] == first['functions']
+    assert cached['global_variables'] == first['global_variables']
+
+def test_parse_cache_prune(tmp_path):
+    """Test pruning keeps the cache within its size limit"""
+    parser = ASTParser(cache_dir=str(tmp_path))
+    for i in range(5):
+        parser.parse_file("test.py", f"x = {i}\n" + SAMPLE_CODE)
+    entries = [p for p in tmp_path.rglob('*') if p.is_file()]
+    
+    parser.prune_cache(entries[0].stat().st_size * 2)
+    
+    assert len([p for p in tmp_path.rglob('*') if p.is_file()]) <= 2
+
+def test_parse_path(tmp_path):
+    """Test parsing raw file bytes matches parsing decoded text"""
+    source = tmp_path / "sample.py"
+    source.write_text(SAMPLE_CODE, encoding='utf-8')
+    
+    result = ASTParser().parse_path(str(source))
+    
+    assert result == ASTParser().parse_file(str(source), SAMPLE_CODE)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file